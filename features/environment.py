@@ -1,6 +1,7 @@
 """
 Behave environment configuration for Graph of Thought BDD tests.
 """
+import asyncio
 import sys
 from pathlib import Path
 
@@ -35,6 +36,28 @@ def before_all(context):
 
     context.create_test_graph = create_test_graph
 
+    # One event loop for the whole run; steps drive coroutines on it with
+    # run_until_complete instead of paying asyncio.run's setup per call.
+    context.event_loop = asyncio.new_event_loop()
+
+
+def after_all(context):
+    """Tear down fixtures created in before_all."""
+    loop = context.event_loop
+    _cancel_pending_tasks(loop)
+    loop.run_until_complete(loop.shutdown_asyncgens())
+    loop.close()
+
+
+def _cancel_pending_tasks(loop):
+    """Cancel tasks left on the loop, such as fire-and-forget event emits."""
+    pending = asyncio.all_tasks(loop)
+    if not pending:
+        return
+    for task in pending:
+        task.cancel()
+    loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+
 
 def before_scenario(context, scenario):
     """Reset context before each scenario."""
@@ -59,3 +82,8 @@ def before_scenario(context, scenario):
     context.validation_issues = None
     context.restored_config = None
     context.last_expanded = None
+
+
+def after_scenario(context, scenario):
+    """Drop tasks the scenario left pending on the shared event loop."""
+    _cancel_pending_tasks(context.event_loop)
@@ -47,6 +47,26 @@ Feature: Data Persistence and Recovery
     And no work should be lost
     And sync status should be clearly indicated
 
+  @mvp-p0
+  Scenario: Offline changes are not replayed twice after a crash
+    Given Jordan loses network connectivity
+    And continues working on the exploration
+    When Jordan's browser crashes unexpectedly
+    And Jordan reopens the application
+    And network connectivity is restored
+    Then each offline change should be applied exactly once
+    And no work should be lost
+
+  @mvp-p0
+  Scenario: Crash recovery after reconnecting skips changes already synced
+    Given Jordan loses network connectivity
+    And continues working on the exploration
+    When Jordan's browser crashes unexpectedly
+    And network connectivity is restored
+    And Jordan reopens the application
+    Then each offline change should be applied exactly once
+    And no work should be lost
+
   # ===========================================================================
   # Project Data Storage - MVP-P0
   # ===========================================================================
@@ -87,6 +107,14 @@ Feature: Data Persistence and Recovery
     And memory usage should be reasonable
     And the graph should be fully navigable
 
+  @mvp-p1
+  Scenario: Large explorations accept new thoughts
+    Given an exploration with 500 thoughts and 600 edges
+    When a follow-up thought is added to the exploration
+    And the exploration is loaded
+    Then the loaded exploration should have 501 thoughts and 500 edges
+    And the graph should be fully navigable
+
   # ===========================================================================
   # Storage Backends - MVP-P1
   # ===========================================================================
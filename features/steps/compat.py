@@ -0,0 +1,8 @@
+"""
+Compatibility helpers shared by the step definition modules.
+"""
+import sys
+
+# dataclass(slots=True) is only available on Python 3.10+; fall back to a
+# regular dataclass on 3.9 so the step modules still import.
+DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
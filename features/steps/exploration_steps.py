@@ -486,10 +486,9 @@ def step_session_interrupted(context, persona):
 @then("all {count:d} thoughts should be recoverable")
 def step_thoughts_recoverable(context, count):
     """Verify all thoughts can be recovered."""
-    # Get all thoughts from the graph using the thoughts property
-    recovered = list(context.graph.thoughts.values())
-    assert len(recovered) >= count, \
-        f"Expected at least {count} thoughts, got {len(recovered)}"
+    recovered = len(context.graph)
+    assert recovered >= count, \
+        f"Expected at least {count} thoughts, got {recovered}"
 
 
 @then("the exploration structure should be intact")
@@ -0,0 +1,20 @@
+"""
+Helpers shared by the step definition modules.
+"""
+import re
+
+# key="quoted value" or key=bare, separated by commas outside quotes
+_KEY_VALUE_RE = re.compile(r'([^\s=,]+)\s*=\s*("[^"]*"|[^,]*)')
+
+
+def run_async(context, coro):
+    """Run a coroutine to completion on the suite's shared event loop."""
+    return context.event_loop.run_until_complete(coro)
+
+
+def parse_key_values(text: str) -> dict:
+    """Parse key=value pairs like 'service=\"api\", version=\"1.0\"' into a dict."""
+    return {
+        key: value.strip().strip('"')
+        for key, value in _KEY_VALUE_RE.findall(text)
+    }
@@ -223,20 +223,22 @@ def step_orchestrator_intent(context, intent, project):
 
 @then("the response should include compaction content")
 def step_compaction_content(context):
-    actions = [a for a in context.response.actions if a.get("type") == "include_in_compaction"]
-    assert len(actions) > 0, "No compaction content in response"
+    assert any(a.get("type") == "include_in_compaction" for a in context.response.actions), \
+        "No compaction content in response"
 
 
 @then("a handoff should be created")
 def step_handoff_in_response(context):
-    actions = [a for a in context.response.actions if a.get("type") == "include_in_compaction"]
-    assert len(actions) > 0 and actions[0].get("handoff_id")
+    action = next(
+        (a for a in context.response.actions if a.get("type") == "include_in_compaction"), None
+    )
+    assert action is not None and action.get("handoff_id")
 
 
 @then("the response should include resumption context")
 def step_resumption_in_response(context):
-    actions = [a for a in context.response.actions if a.get("type") == "show_resumption_context"]
-    assert len(actions) > 0, "No resumption context in response"
+    assert any(a.get("type") == "show_resumption_context" for a in context.response.actions), \
+        "No resumption context in response"
 
 
 # =============================================================================
@@ -325,5 +327,5 @@ def step_custom_handler(context):
 
 @then("the response should include the custom warning")
 def step_has_custom_warning(context):
-    warnings = [a for a in context.response.actions if a.get("type") == "custom_warning"]
-    assert len(warnings) > 0, "Custom warning not found"
+    assert any(a.get("type") == "custom_warning" for a in context.response.actions), \
+        "Custom warning not found"
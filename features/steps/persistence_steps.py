@@ -2,13 +2,33 @@
 Step definitions for persistence-related BDD tests.
 """
 import asyncio
-import tempfile
+import bisect
+import dataclasses
+import json
+import operator
+import pickle
 import shutil
+import struct
+import tempfile
+import time
+from array import array
+from collections import Counter, deque
+from collections.abc import Mapping, MutableMapping, MutableSequence, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from enum import Enum
+from functools import partial
+from itertools import count
 from pathlib import Path
+from types import MappingProxyType
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Set, Tuple
+
 from behave import given, when, then, use_step_matcher
 
 from graph_of_thought.persistence import InMemoryPersistence, FilePersistence
 
+from features.steps.compat import DATACLASS_SLOTS
+
 use_step_matcher("parse")
 
 
@@ -176,10 +196,44 @@ def after_scenario(context, scenario):
 # =============================================================================
 # These steps support the data_persistence.feature MVP-P0 scenarios
 
-from dataclasses import dataclass, field
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-from enum import Enum
+# Save paths record time.monotonic_ns(); this anchor converts those readings
+# to wall-clock datetimes only when a step inspects them.
+_WALL_ANCHOR = datetime.now()
+_MONOTONIC_ANCHOR_NS = time.monotonic_ns()
+
+
+def _ns_to_datetime(monotonic_ns: int) -> datetime:
+    """Convert a time.monotonic_ns() reading to a wall-clock datetime."""
+    return _WALL_ANCHOR + timedelta(microseconds=(monotonic_ns - _MONOTONIC_ANCHOR_NS) // 1000)
+
+
+# Saved projects are held as compact JSON bytes
+def _pack(data: dict) -> bytes:
+    """Serialize a plain dict for storage."""
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+def _unpack(blob: bytes) -> dict:
+    """Deserialize a dict written by _pack."""
+    return json.loads(blob)
+
+
+def scenario_now(context) -> datetime:
+    """
+    Wall-clock time frozen for the current scenario.
+
+    Steps don't depend on time passing between them, so the clock is read
+    once per scenario; behave drops the cached value with the scenario layer.
+    """
+    if 'frozen_now' not in context:
+        context.frozen_now = datetime.now()
+    return context.frozen_now
+
+
+# Offline change log record: (timestamp_ns, exploration index, change-type index).
+# Symbol indices are 32-bit; the symbol table only grows, so 16-bit ones
+# would overflow once 65,536 distinct ids had been logged.
+_WAL_RECORD = struct.Struct('<QII')
 
 
 class SaveStatus(Enum):
@@ -189,51 +243,237 @@ class SaveStatus(Enum):
     OFFLINE = "offline"
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class AppExploration:
     """An exploration session for application-level tests."""
     id: str
     name: str
-    thoughts: Dict[str, dict] = field(default_factory=dict)
-    edges: List[tuple] = field(default_factory=list)
+    # Plain dict/list, or column-backed views for large explorations
+    thoughts: MutableMapping[str, dict] = field(default_factory=dict)
+    edges: MutableSequence[tuple] = field(default_factory=list)
     created_at: datetime = field(default_factory=datetime.now)
-    last_saved: Optional[datetime] = None
+    last_saved_ns: Optional[int] = None
     save_status: SaveStatus = SaveStatus.PENDING
+    # Time of the latest change the auto-save throttle held back; the
+    # coalesced save is stamped with it on the next flush().
+    deferred_save_ns: Optional[int] = None
+
+    @property
+    def last_saved(self) -> Optional[datetime]:
+        """Wall-clock time of the last save, if any."""
+        if self.last_saved_ns is None:
+            return None
+        return _ns_to_datetime(self.last_saved_ns)
+
+
+class ColumnarThoughts(MutableMapping):
+    """
+    Thought mapping backed by parallel column arrays.
+
+    Used for large explorations: each thought costs a few bytes of column
+    storage instead of a dict, and thought dicts are built on access.
+    Thoughts written after the columns are built are kept as plain dicts
+    alongside them.
+    """
+
+    def __init__(self, ids: Tuple[str, ...], depths: array, scores: array):
+        self._ids = ids
+        # Built in a single C-level pass rather than per-id inserts
+        self._index = dict(zip(ids, range(len(ids))))
+        self.depths = depths
+        self.scores = scores
+        # Thoughts written since the columns were built, and the column
+        # ids they replaced or that were deleted
+        self._written: Dict[str, dict] = {}
+        self._shadowed: Set[str] = set()
+
+    def __getitem__(self, thought_id: str) -> dict:
+        written = self._written.get(thought_id)
+        if written is not None:
+            return written
+        if thought_id in self._shadowed:
+            raise KeyError(thought_id)
+        i = self._index[thought_id]
+        return {
+            'id': thought_id,
+            'content': f"Thought {i}",
+            'depth': self.depths[i],
+            'score': self.scores[i],
+        }
+
+    def __setitem__(self, thought_id: str, thought: dict) -> None:
+        if thought_id in self._index:
+            self._shadowed.add(thought_id)
+        self._written[thought_id] = thought
+
+    def __delitem__(self, thought_id: str) -> None:
+        if thought_id not in self:
+            raise KeyError(thought_id)
+        self._written.pop(thought_id, None)
+        if thought_id in self._index:
+            self._shadowed.add(thought_id)
+
+    def __contains__(self, thought_id) -> bool:
+        if thought_id in self._written:
+            return True
+        return thought_id in self._index and thought_id not in self._shadowed
+
+    def __iter__(self) -> Iterator[str]:
+        shadowed = self._shadowed
+        if shadowed:
+            yield from (tid for tid in self._ids if tid not in shadowed)
+        else:
+            yield from self._ids
+        yield from self._written
+
+    def __len__(self) -> int:
+        return len(self._ids) - len(self._shadowed) + len(self._written)
+
+
+class ColumnarEdges(MutableSequence):
+    """
+    Edge list backed by parent/child index columns.
+
+    Edges are stored as integer indices into the exploration's thought ids;
+    (parent_id, child_id) tuples are built on access and mapped back to
+    indices on write.
+    """
+
+    def __init__(self, ids: Sequence[str], parents: array, children: array):
+        self._ids = ids
+        self.parents = parents
+        self.children = children
+        # id -> index lookup, only built once an edge is written
+        self._id_index: Optional[Dict[str, int]] = None
+
+    def __getitem__(self, index):
+        ids = self._ids
+        if isinstance(index, slice):
+            return [
+                (ids[p], ids[c])
+                for p, c in zip(self.parents[index], self.children[index])
+            ]
+        return ids[self.parents[index]], ids[self.children[index]]
+
+    def __setitem__(self, index: int, edge: tuple) -> None:
+        parent_id, child_id = edge
+        self.parents[index] = self._index_of(parent_id)
+        self.children[index] = self._index_of(child_id)
+
+    def __delitem__(self, index) -> None:
+        del self.parents[index]
+        del self.children[index]
+
+    def insert(self, index: int, edge: tuple) -> None:
+        parent_id, child_id = edge
+        self.parents.insert(index, self._index_of(parent_id))
+        self.children.insert(index, self._index_of(child_id))
+
+    def __len__(self) -> int:
+        return len(self.parents)
+
+    def _index_of(self, thought_id: str) -> int:
+        """Column index for a thought id, adding ids the columns haven't seen."""
+        if self._id_index is None:
+            # The id table may be shared with the thought columns; copy it
+            # before the first write can grow it
+            self._ids = list(self._ids)
+            self._id_index = dict(zip(self._ids, range(len(self._ids))))
+        index = self._id_index.get(thought_id)
+        if index is None:
+            index = self._id_index[thought_id] = len(self._ids)
+            self._ids.append(thought_id)
+        return index
+
+    def indices_within(self, bound: int, limit: Optional[int] = None) -> bool:
+        """Check that the first ``limit`` edges only reference indices below ``bound``."""
+        parents = self.parents[:limit]
+        children = self.children[:limit]
+        if not parents:
+            return True
+        return (
+            min(parents) >= 0 and max(parents) < bound
+            and min(children) >= 0 and max(children) < bound
+        )
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class ProjectData:
-    """Complete project data for persistence."""
+    """Complete project data for persistence.
+
+    Budget and permission data have a small fixed shape, so they are stored
+    as explicit fields rather than a dict / list per project.
+    """
     id: str
     name: str
     work_chunks: int = 0
     explorations: int = 0
     decisions: int = 0
     questions: int = 0
-    budgets: Dict = field(default_factory=dict)
-    permissions: List[str] = field(default_factory=list)
+    token_budget: int = 0
+    tokens_used: int = 0
+    can_read: bool = False
+    can_write: bool = False
+    can_admin: bool = False
+
+    @property
+    def budgets(self) -> Dict[str, int]:
+        """Budget data in the legacy dict shape."""
+        if not self.token_budget:
+            return {}
+        return {"token_budget": self.token_budget, "used": self.tokens_used}
+
+    @property
+    def permissions(self) -> List[str]:
+        """Granted permissions in the legacy list shape."""
+        return [
+            name for name, granted in (
+                ("read", self.can_read),
+                ("write", self.can_write),
+                ("admin", self.can_admin),
+            ) if granted
+        ]
 
 
 class MockAppPersistenceService:
     """Mock service for application-level persistence operations."""
 
+    __slots__ = (
+        "explorations", "projects", "save_queue", "recovery_data", "notifications",
+        "notification_counts", "changes_recorded", "changes_applied",
+        "_wal", "_wal_symbols", "_wal_symbol_index",
+        "_exploration_counter", "_auto_save_enabled", "_save_interval_seconds",
+        "_max_data_loss_seconds", "_now_ns",
+    )
+
     def __init__(self):
         self.explorations: Dict[str, AppExploration] = {}
-        self.projects: Dict[str, ProjectData] = {}
-        self.save_queue: List[str] = []
-        self.offline_changes: List[Dict] = []
-        self.recovery_data: Dict = {}
+        self.projects: Dict[str, bytes] = {}
+        self.save_queue: Deque[str] = deque()
+        # Offline changes are appended to a write-ahead log of fixed-size
+        # records; ids and change types are interned into lookup tables.
+        self._wal = bytearray()
+        self._wal_symbols: List[str] = []
+        self._wal_symbol_index: Dict[str, int] = {}
+        self.changes_recorded = 0
+        self.changes_applied = 0
+        # Crash checkpoints: exploration id -> (state snapshot, log tail)
+        self.recovery_data: Dict[str, Tuple[bytes, bytes]] = {}
         self.notifications: List[Dict] = []
+        self.notification_counts: Counter = Counter()
         self._exploration_counter = 0
         self._auto_save_enabled = True
         self._save_interval_seconds = 5
         self._max_data_loss_seconds = 30
+        # Auto-save is throttled per exploration: changes inside the save
+        # interval are coalesced into a deferred save on the exploration.
+        self._now_ns = time.monotonic_ns
 
     def create_exploration(self, name: str) -> AppExploration:
         """Create a new exploration."""
         self._exploration_counter += 1
         exp = AppExploration(
-            id=f"EXP-{self._exploration_counter:04d}",
+            id="EXP-%04d" % self._exploration_counter,
             name=name,
         )
         self.explorations[exp.id] = exp
@@ -244,8 +484,11 @@ class MockAppPersistenceService:
         exp = self.explorations.get(exploration_id)
         if not exp:
             raise ValueError(f"Exploration {exploration_id} not found")
+        return self.add_thought_to(exp, content, parent_id)
 
-        thought_id = f"T-{len(exp.thoughts) + 1:04d}"
+    def add_thought_to(self, exp: AppExploration, content: str, parent_id: Optional[str] = None) -> dict:
+        """Add a thought to an exploration the caller already holds."""
+        thought_id = "T-%04d" % (len(exp.thoughts) + 1)
         depth = 0
         if parent_id and parent_id in exp.thoughts:
             depth = exp.thoughts[parent_id].get('depth', 0) + 1
@@ -259,52 +502,96 @@ class MockAppPersistenceService:
         }
         exp.thoughts[thought_id] = thought
 
-        # Mark as pending save
-        exp.save_status = SaveStatus.PENDING
-        self._auto_save(exploration_id)
+        # Mark as pending save (skip the write if already pending)
+        if exp.save_status is not SaveStatus.PENDING:
+            exp.save_status = SaveStatus.PENDING
+        self._auto_save(exp)
 
         return thought
 
-    def _auto_save(self, exploration_id: str):
-        """Simulate auto-save behavior."""
+    def _auto_save(self, exp: AppExploration):
+        """Simulate auto-save behavior, coalescing saves within the interval."""
         if not self._auto_save_enabled:
+            # Offline: nothing is saved until the connection sync, which
+            # also completes any save deferred before going offline
             return
 
-        exp = self.explorations.get(exploration_id)
-        if exp:
-            exp.last_saved = datetime.now()
-            exp.save_status = SaveStatus.SAVED
+        now = self._now_ns()
+        last = exp.last_saved_ns
+        if last is not None and now - last < self._save_interval_seconds * 1_000_000_000:
+            exp.deferred_save_ns = now
+            return
+
+        self._mark_saved(exp, now)
+
+    def _mark_saved(self, exp: AppExploration, now: int):
+        """Stamp an exploration as saved and drop any deferred auto-save."""
+        exp.last_saved_ns = now
+        exp.save_status = SaveStatus.SAVED
+        exp.deferred_save_ns = None
+
+    def flush(self):
+        """Complete the auto-saves coalesced inside the save interval.
+
+        Stands in for the save timer firing; each deferred save is stamped
+        with the time of the latest change it covers. Nothing is saved
+        while offline.
+        """
+        if not self._auto_save_enabled:
+            return
+        for exp in self.explorations.values():
+            if exp.deferred_save_ns is not None:
+                self._mark_saved(exp, exp.deferred_save_ns)
 
     def save_exploration(self, exploration_id: str) -> bool:
         """Explicitly save an exploration."""
         exp = self.explorations.get(exploration_id)
         if exp:
-            exp.last_saved = datetime.now()
-            exp.save_status = SaveStatus.SAVED
+            self._mark_saved(exp, self._now_ns())
             return True
         return False
 
     def simulate_crash(self, exploration_id: str):
-        """Simulate a browser crash and store recovery data."""
+        """Simulate a browser crash, checkpointing state for recovery.
+
+        The checkpoint is a snapshot of the exploration plus its records in
+        the offline change log that had not been synced yet.
+        """
         exp = self.explorations.get(exploration_id)
         if exp:
-            self.recovery_data[exploration_id] = {
-                "thoughts": len(exp.thoughts),
-                "last_saved": exp.last_saved,
-                "save_status": exp.save_status,
-            }
+            snapshot = pickle.dumps(
+                (dict(exp.thoughts), list(exp.edges)),
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+            self.recovery_data[exploration_id] = (snapshot, self._exploration_log(exploration_id))
 
     def recover_exploration(self, exploration_id: str) -> AppExploration:
-        """Recover an exploration after crash."""
+        """Recover an exploration after crash from its snapshot and log tail.
+
+        Offline, the tail stays in the change log for restore_connection.
+        Online, the tail's records still pending in the log are applied and
+        removed from it; records already synced since the crash are skipped.
+        """
         exp = self.explorations.get(exploration_id)
         if exp:
-            self.notifications.append({
+            checkpoint = self.recovery_data.pop(exploration_id, None)
+            if checkpoint is not None:
+                snapshot, log_tail = checkpoint
+                exp.thoughts, exp.edges = pickle.loads(snapshot)
+                if self._auto_save_enabled:
+                    self._replay_log(self._consume_log(log_tail))
+            self._notify({
                 "type": "recovery_complete",
                 "exploration_id": exploration_id,
                 "message": "Work recovered successfully",
             })
         return exp
 
+    def _notify(self, notification: Dict):
+        """Record a notification and count it by type."""
+        self.notifications.append(notification)
+        self.notification_counts[notification["type"]] += 1
+
     def go_offline(self):
         """Simulate going offline."""
         self._auto_save_enabled = False
@@ -312,39 +599,127 @@ class MockAppPersistenceService:
     def restore_connection(self):
         """Simulate restoring connection and syncing."""
         self._auto_save_enabled = True
-        for change in self.offline_changes:
-            self._process_offline_change(change)
-        self.offline_changes.clear()
+        self._replay_log(self._wal)
+        self._wal.clear()
+        self.flush()
+
+    def _replay_log(self, log: bytes):
+        """Apply every change recorded in an offline change log."""
+        symbols = self._wal_symbols
+        for _, exp_idx, type_idx in _WAL_RECORD.iter_unpack(log):
+            self._process_offline_change(symbols[exp_idx], symbols[type_idx])
+
+    @staticmethod
+    def _log_records(log: bytes) -> Iterator[bytes]:
+        """Split an offline change log into its fixed-size records."""
+        size = _WAL_RECORD.size
+        return (bytes(log[i:i + size]) for i in range(0, len(log), size))
+
+    def _exploration_log(self, exploration_id: str) -> bytes:
+        """This exploration's records in the offline change log."""
+        index = self._wal_symbol_index.get(exploration_id)
+        if index is None:
+            return b""
+        return b"".join(
+            record for record in self._log_records(self._wal)
+            if _WAL_RECORD.unpack(record)[1] == index
+        )
 
-    def _process_offline_change(self, change: Dict):
+    def _consume_log(self, records: bytes) -> bytes:
+        """Remove records from the offline change log, returning those taken.
+
+        Records no longer in the log were already applied and are left out,
+        so each change is applied once however recovery and sync interleave.
+        One pass over the log splits it into taken and kept records; the log
+        is cleared on every sync, so it stays small.
+        """
+        wanted = Counter(self._log_records(records))
+        taken = bytearray()
+        kept = bytearray()
+        for record in self._log_records(self._wal):
+            if wanted[record]:
+                wanted[record] -= 1
+                taken += record
+            else:
+                kept += record
+        if taken:
+            self._wal[:] = kept
+        return bytes(taken)
+
+    def _process_offline_change(self, exploration_id: str, change_type: str):
         """Process an offline change."""
-        exp_id = change.get("exploration_id")
-        if exp_id and exp_id in self.explorations:
-            self.save_exploration(exp_id)
+        self.changes_applied += 1
+        if exploration_id in self.explorations:
+            self.save_exploration(exploration_id)
+
+    def _wal_symbol(self, value: str) -> int:
+        """Return the log table index for an id or change type."""
+        index = self._wal_symbol_index.get(value)
+        if index is None:
+            index = len(self._wal_symbols)
+            self._wal_symbols.append(value)
+            self._wal_symbol_index[value] = index
+        return index
 
     def add_offline_change(self, exploration_id: str, change_type: str):
         """Record an offline change."""
-        self.offline_changes.append({
-            "exploration_id": exploration_id,
-            "type": change_type,
-            "timestamp": datetime.now(),
-        })
+        self.changes_recorded += 1
+        self._wal += _WAL_RECORD.pack(
+            self._now_ns(),
+            self._wal_symbol(exploration_id),
+            self._wal_symbol(change_type),
+        )
+
+    @property
+    def offline_changes(self) -> List[Dict]:
+        """Offline changes not yet synced, decoded from the log."""
+        symbols = self._wal_symbols
+        return [
+            {
+                "exploration_id": symbols[exp_idx],
+                "type": symbols[type_idx],
+                "timestamp_ns": timestamp_ns,
+            }
+            for timestamp_ns, exp_idx, type_idx in _WAL_RECORD.iter_unpack(self._wal)
+        ]
+
+    @property
+    def offline_change_count(self) -> int:
+        """Number of offline changes not yet synced."""
+        return len(self._wal) // _WAL_RECORD.size
 
     def save_project(self, project: ProjectData) -> bool:
-        """Save complete project state."""
-        self.projects[project.id] = project
+        """Save complete project state as serialized bytes."""
+        self.projects[project.id] = _pack(dataclasses.asdict(project))
         return True
 
     def load_project(self, project_id: str) -> Optional[ProjectData]:
         """Load a project from storage."""
-        return self.projects.get(project_id)
+        blob = self.projects.get(project_id)
+        if blob is None:
+            return None
+        return ProjectData(**_unpack(blob))
+
+
+def _scenario_services(context) -> Dict[str, object]:
+    """Scenario-scoped registry of mock services, keyed by service name."""
+    if 'persistence_services' not in context:
+        context.persistence_services = {}
+    return context.persistence_services
+
+
+def _get_service(context, key: str, factory):
+    """Get or create a scenario-scoped mock service."""
+    services = _scenario_services(context)
+    service = services.get(key)
+    if service is None:
+        service = services[key] = factory()
+    return service
 
 
 def get_app_persistence_service(context) -> MockAppPersistenceService:
     """Get or create the application persistence service."""
-    if not hasattr(context, 'app_persistence_service'):
-        context.app_persistence_service = MockAppPersistenceService()
-    return context.app_persistence_service
+    return _get_service(context, 'app_persistence', MockAppPersistenceService)
 
 
 # =============================================================================
@@ -354,7 +729,7 @@ def get_app_persistence_service(context) -> MockAppPersistenceService:
 @given("the persistence layer is available")
 def step_persistence_layer_available(context):
     """Set up the persistence layer for application tests."""
-    context.app_persistence_service = MockAppPersistenceService()
+    _scenario_services(context)['app_persistence'] = MockAppPersistenceService()
 
 
 # =============================================================================
@@ -367,27 +742,26 @@ def step_actively_exploring(context, persona, count):
     context.current_persona = persona
     service = get_app_persistence_service(context)
 
-    context.current_exploration = service.create_exploration(f"{persona}'s Exploration")
+    exp = context.current_exploration = service.create_exploration(f"{persona}'s Exploration")
+    add = service.add_thought_to
 
-    root = service.add_thought(context.current_exploration.id, "Root thought")
+    root = add(exp, "Root thought")
     last_id = root['id']
 
-    for i in range(count - 1):
-        thought = service.add_thought(
-            context.current_exploration.id,
-            f"Thought {i + 2}",
-            parent_id=last_id if i % 3 == 0 else None
-        )
-        last_id = thought['id']
+    # Every third thought is linked to the one before it
+    specs = [(f"Thought {i + 2}", i % 3 == 0) for i in range(count - 1)]
+    for content, linked in specs:
+        last_id = add(exp, content, parent_id=last_id if linked else None)['id']
 
 
 @then("all {count:d} thoughts should be persisted to storage")
 def step_thoughts_persisted(context, count):
     """Verify all thoughts are persisted."""
+    get_app_persistence_service(context).flush()
     exp = context.current_exploration
     assert len(exp.thoughts) == count, \
         f"Expected {count} thoughts, got {len(exp.thoughts)}"
-    assert exp.save_status == SaveStatus.SAVED, "Exploration not saved"
+    assert exp.save_status is SaveStatus.SAVED, "Exploration not saved"
 
 
 @then("the save should happen within {seconds:d} seconds of each change")
@@ -408,9 +782,10 @@ def step_no_save_action_needed(context, persona):
 @then("a visual indicator should show \"{message}\"")
 def step_visual_indicator(context, message):
     """Verify save status indicator."""
+    get_app_persistence_service(context).flush()
     exp = context.current_exploration
     if "saved" in message.lower():
-        assert exp.save_status == SaveStatus.SAVED, "Should show saved status"
+        assert exp.save_status is SaveStatus.SAVED, "Should show saved status"
 
 
 # =============================================================================
@@ -423,10 +798,11 @@ def step_has_changes(context, persona):
     context.current_persona = persona
     service = get_app_persistence_service(context)
 
-    context.current_exploration = service.create_exploration(f"{persona}'s Work")
+    exp = context.current_exploration = service.create_exploration(f"{persona}'s Work")
+    add = service.add_thought_to
 
     for i in range(5):
-        service.add_thought(context.current_exploration.id, f"Change {i + 1}")
+        add(exp, f"Change {i + 1}")
 
 
 @when("{persona}'s browser crashes unexpectedly")
@@ -464,9 +840,8 @@ def step_max_data_loss(context, seconds):
 def step_recovery_notification(context, persona):
     """Verify recovery notification."""
     service = get_app_persistence_service(context)
-    notifications = [n for n in service.notifications
-                     if n.get('type') == 'recovery_complete']
-    assert len(notifications) > 0, "No recovery notification sent"
+    assert service.notification_counts['recovery_complete'] > 0, \
+        "No recovery notification sent"
 
 
 # =============================================================================
@@ -488,10 +863,13 @@ def step_loses_connectivity(context, persona):
 def step_continues_working_offline(context):
     """Continue working while offline."""
     service = get_app_persistence_service(context)
+    exp = context.current_exploration
+    add = service.add_thought_to
+    record_change = service.add_offline_change
 
     for i in range(3):
-        service.add_thought(context.current_exploration.id, f"Offline thought {i + 1}")
-        service.add_offline_change(context.current_exploration.id, "add_thought")
+        add(exp, f"Offline thought {i + 1}")
+        record_change(exp.id, "add_thought")
 
 
 @when("network connectivity is restored")
@@ -505,7 +883,7 @@ def step_connectivity_restored(context):
 def step_offline_changes_sync(context):
     """Verify offline changes synced."""
     service = get_app_persistence_service(context)
-    assert len(service.offline_changes) == 0, "Offline changes should be synced"
+    assert service.offline_change_count == 0, "Offline changes should be synced"
 
 
 @then("no work should be lost")
@@ -515,11 +893,21 @@ def step_no_work_lost(context):
     assert len(exp.thoughts) > 0, "Work should be preserved"
 
 
+@then("each offline change should be applied exactly once")
+def step_changes_applied_once(context):
+    """Verify recovery and sync together applied every offline change once."""
+    service = get_app_persistence_service(context)
+    assert service.offline_change_count == 0, "Offline changes left unsynced"
+    assert service.changes_applied == service.changes_recorded, \
+        f"Applied {service.changes_applied} of {service.changes_recorded} offline changes"
+
+
 @then("sync status should be clearly indicated")
 def step_sync_status_indicated(context):
     """Verify sync status is shown."""
+    get_app_persistence_service(context).flush()
     exp = context.current_exploration
-    assert exp.save_status == SaveStatus.SAVED, "Should show synced status"
+    assert exp.save_status is SaveStatus.SAVED, "Should show synced status"
 
 
 # =============================================================================
@@ -548,9 +936,12 @@ def step_project_with_components(context, project_name):
             value = int(row['value'])
 
             if metric == 'work_chunks':
-                for i in range(value):
-                    chunk = service.create_work_chunk(project, f"Chunk {i+1}", "Jordan")
-                    chunk.status = ChunkStatus.COMPLETED
+                service.create_work_chunks(
+                    project,
+                    [f"Chunk {i+1}" for i in range(value)],
+                    "Jordan",
+                    status=ChunkStatus.COMPLETED,
+                )
             elif metric == 'tokens_used':
                 project.tokens_used = value
             elif metric == 'tokens_remaining':
@@ -632,8 +1023,11 @@ def step_saved_project(context, project_name):
         explorations=3,
         decisions=4,
         questions=6,
-        budgets={"token_budget": 100000, "used": 45000},
-        permissions=["read", "write", "admin"],
+        token_budget=100000,
+        tokens_used=45000,
+        can_read=True,
+        can_write=True,
+        can_admin=True,
     )
     service.save_project(project)
     context.saved_project_id = project.id
@@ -667,9 +1061,10 @@ def step_project_data_restored(context):
         elif component == 'questions':
             assert project.questions > 0, "Questions not loaded"
         elif component == 'budgets':
-            assert len(project.budgets) > 0, "Budgets not loaded"
+            assert project.token_budget > 0, "Budgets not loaded"
         elif component == 'permissions':
-            assert len(project.permissions) > 0, "Permissions not loaded"
+            assert project.can_read or project.can_write or project.can_admin, \
+                "Permissions not loaded"
 
 
 # =============================================================================
@@ -683,9 +1078,7 @@ from graph_of_thought.core import InMemoryFileSystem
 
 def get_inmemory_fs(context) -> InMemoryFileSystem:
     """Get or create the in-memory filesystem."""
-    if not hasattr(context, 'inmemory_fs'):
-        context.inmemory_fs = InMemoryFileSystem()
-    return context.inmemory_fs
+    return _get_service(context, 'inmemory_fs', InMemoryFileSystem)
 
 
 # =============================================================================
@@ -701,23 +1094,23 @@ def step_large_exploration(context, thought_count, edge_count):
     context.current_exploration = service.create_exploration("Large Exploration")
     exp = context.current_exploration
 
-    # Create thoughts
-    thought_ids = []
-    for i in range(thought_count):
-        thought_id = f"T-{i:04d}"
-        exp.thoughts[thought_id] = {
-            'id': thought_id,
-            'content': f"Thought {i}",
-            'depth': i % 10,
-            'score': 0.5 + (i % 50) / 100,
-        }
-        thought_ids.append(thought_id)
+    # Create thoughts as columns rather than one dict per thought. One id
+    # tuple is shared by the thought and edge columns; edges hold integer
+    # indices into it.
+    thought_ids = tuple("T-%04d" % i for i in range(thought_count))
+    exp.thoughts = ColumnarThoughts(
+        thought_ids,
+        depths=array('b', (i % 10 for i in range(thought_count))),
+        scores=array('d', (0.5 + (i % 50) / 100 for i in range(thought_count))),
+    )
 
-    # Create edges (connect thoughts in a graph pattern)
-    for i in range(min(edge_count, thought_count - 1)):
-        parent_idx = i % (thought_count - 1)
-        child_idx = (i + 1) % thought_count
-        exp.edges.append((thought_ids[parent_idx], thought_ids[child_idx]))
+    # Create edges (connect thoughts in a graph pattern) as index columns
+    edge_range = range(min(edge_count, thought_count - 1))
+    exp.edges = ColumnarEdges(
+        thought_ids,
+        parents=array('l', (i % (thought_count - 1) for i in edge_range)),
+        children=array('l', ((i + 1) % thought_count for i in edge_range)),
+    )
 
     # Save the exploration
     service.save_exploration(exp.id)
@@ -736,6 +1129,25 @@ def step_load_exploration(context):
     context.load_time = time.time() - start_time
 
 
+@when("a follow-up thought is added to the exploration")
+def step_add_follow_up_thought(context):
+    """Add a thought under the last thought in the exploration's edges."""
+    service = get_app_persistence_service(context)
+    exp = context.current_exploration
+    _, last_child_id = exp.edges[-1]
+    service.add_thought_to(exp, "Follow-up thought", parent_id=last_child_id)
+
+
+@then("the loaded exploration should have {thought_count:d} thoughts and {edge_count:d} edges")
+def step_loaded_exploration_size(context, thought_count, edge_count):
+    """Verify the loaded exploration's thought and edge counts."""
+    exp = context.loaded_exploration
+    assert len(exp.thoughts) == thought_count, \
+        f"Expected {thought_count} thoughts, got {len(exp.thoughts)}"
+    assert len(exp.edges) == edge_count, \
+        f"Expected {edge_count} edges, got {len(exp.edges)}"
+
+
 @then("loading should complete within {seconds:d} seconds")
 def step_loading_time(context, seconds):
     """Verify loading completed within time limit."""
@@ -746,7 +1158,6 @@ def step_loading_time(context, seconds):
 @then("memory usage should be reasonable")
 def step_memory_reasonable(context):
     """Verify memory usage is reasonable."""
-    import sys
     exp = context.loaded_exploration
     # Estimate: each thought ~500 bytes, each edge ~100 bytes
     estimated_size = len(exp.thoughts) * 500 + len(exp.edges) * 100
@@ -762,9 +1173,13 @@ def step_graph_navigable(context):
     exp = context.loaded_exploration
     assert len(exp.thoughts) > 0, "No thoughts to navigate"
     assert len(exp.edges) > 0, "No edges to navigate"
-    # Verify edges reference valid thoughts
+    # Verify edges reference valid thoughts (first 100 edges)
+    if isinstance(exp.edges, ColumnarEdges):
+        assert exp.edges.indices_within(len(exp.thoughts), limit=100), \
+            "Edge references a thought outside the exploration"
+        return
     thought_ids = set(exp.thoughts.keys())
-    for parent_id, child_id in exp.edges[:100]:  # Check first 100 edges
+    for parent_id, child_id in exp.edges[:100]:
         assert parent_id in thought_ids, f"Edge parent {parent_id} not found"
         assert child_id in thought_ids, f"Edge child {child_id} not found"
 
@@ -773,7 +1188,7 @@ def step_graph_navigable(context):
 # Storage Backend Steps - MVP-P1
 # =============================================================================
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class StorageBackend:
     """Mock storage backend configuration."""
     name: str
@@ -785,6 +1200,8 @@ class StorageBackend:
 class MockStorageService:
     """Service for testing storage backend scenarios."""
 
+    __slots__ = ("backends", "current_backend", "explorations", "environment_config")
+
     def __init__(self):
         self.backends: Dict[str, StorageBackend] = {
             'in-memory': StorageBackend('in-memory', 'memory'),
@@ -830,9 +1247,7 @@ class MockStorageService:
 
 def get_storage_service(context) -> MockStorageService:
     """Get or create the storage service."""
-    if not hasattr(context, 'storage_service'):
-        context.storage_service = MockStorageService()
-    return context.storage_service
+    return _get_service(context, 'storage', MockStorageService)
 
 
 @given('the storage backend is "{backend}"')
@@ -915,59 +1330,125 @@ def step_verify_backend_config(context):
 # Backup and Recovery Steps - MVP-P1
 # =============================================================================
 
-@dataclass
+_EPOCH = datetime(1970, 1, 1)
+_ONE_US = timedelta(microseconds=1)
+_US_PER_DAY = 86_400_000_000
+
+
+def _to_epoch_us(dt: datetime) -> int:
+    """Convert a naive datetime to integer microseconds since the epoch.
+
+    Exact integer arithmetic on the same naive clock as ``datetime.now()``,
+    so values round-trip through _from_epoch_us without float drift.
+    """
+    return (dt - _EPOCH) // _ONE_US
+
+
+def _from_epoch_us(us: int) -> datetime:
+    """Inverse of _to_epoch_us."""
+    return _EPOCH + timedelta(microseconds=us)
+
+
+@dataclass(**DATACLASS_SLOTS)
 class Backup:
     """Represents a backup."""
     id: str
-    timestamp: datetime
+    timestamp: int  # microseconds since the epoch, see _to_epoch_us
     location: str
     verified: bool = False
     size_bytes: int = 0
 
+    @property
+    def ts_datetime(self) -> datetime:
+        """Backup time as a datetime."""
+        return _from_epoch_us(self.timestamp)
+
 
 class MockBackupService:
     """Service for testing backup scenarios."""
 
-    def __init__(self):
+    def __init__(self, now_fn: Callable[[], datetime] = datetime.now):
+        self._now_fn = now_fn
+        # Backups are kept in timestamp order, with a parallel list of
+        # timestamps for bisecting the retention cutoff.
         self.backups: List[Backup] = []
+        self._timestamps: List[int] = []
+        self._by_id: Dict[str, Backup] = {}
+        # Ids come from a counter so rotation never frees one for reuse
+        self._backup_seq = count(1)
         self.schedule: Optional[str] = None
         self.retention_days: int = 30
         self.rto_hours: int = 4
         self.rpo_hours: int = 1
-        self.transaction_logs: List[Dict] = []
+        # Transaction logs as parallel columns, ordered by timestamp, so
+        # point-in-time recovery can bisect the replay window.
+        self.tx_timestamps: List[datetime] = []
+        self.tx_operations: List[Tuple[str, ...]] = []
         self.recovery_log: List[str] = []
 
     def set_schedule(self, schedule: str):
         """Set backup schedule."""
         self.schedule = schedule
 
+    def next_backup_id(self) -> str:
+        """Allocate a backup id that has not been used before."""
+        return "BACKUP-%04d" % next(self._backup_seq)
+
     def create_backup(self) -> Backup:
         """Create a new backup."""
         backup = Backup(
-            id=f"BACKUP-{len(self.backups) + 1:04d}",
-            timestamp=datetime.now(),
+            id=self.next_backup_id(),
+            timestamp=_to_epoch_us(self._now_fn()),
             location="/backups/offsite/",
             size_bytes=1024 * 1024 * 100,  # 100MB
         )
-        self.backups.append(backup)
+        return self.add_backup(backup)
+
+    def add_backup(self, backup: Backup) -> Backup:
+        """Register an existing backup, keeping the indexes in sync."""
+        i = bisect.bisect_right(self._timestamps, backup.timestamp)
+        self._timestamps.insert(i, backup.timestamp)
+        self.backups.insert(i, backup)
+        self._by_id[backup.id] = backup
         return backup
 
+    def add_backups(self, backups: List[Backup]):
+        """Register many backups at once, sorting by timestamp a single time."""
+        self.backups.extend(backups)
+        self.backups.sort(key=operator.attrgetter('timestamp'))
+        self._timestamps = [b.timestamp for b in self.backups]
+        self._by_id.update((b.id, b) for b in backups)
+
     def verify_backup(self, backup_id: str) -> bool:
         """Verify backup integrity."""
-        for backup in self.backups:
-            if backup.id == backup_id:
-                backup.verified = True
-                return True
-        return False
+        backup = self._by_id.get(backup_id)
+        if backup is None:
+            return False
+        backup.verified = True
+        return True
 
     def rotate_backups(self):
         """Rotate old backups per retention policy."""
-        cutoff = datetime.now() - timedelta(days=self.retention_days)
-        self.backups = [b for b in self.backups if b.timestamp > cutoff]
+        cutoff = _to_epoch_us(self._now_fn()) - self.retention_days * _US_PER_DAY
+        i = bisect.bisect_right(self._timestamps, cutoff)
+        if i:
+            del self.backups[:i]
+            del self._timestamps[:i]
+            self._by_id = {b.id: b for b in self.backups}
+
+    def log_transactions(self, timestamp: datetime, operations: Tuple[str, ...]):
+        """Record a transaction log entry, keeping timestamp order."""
+        i = bisect.bisect_right(self.tx_timestamps, timestamp)
+        self.tx_timestamps.insert(i, timestamp)
+        self.tx_operations.insert(i, operations)
 
     def recover_to_point(self, target_time: datetime) -> bool:
         """Recover to a specific point in time."""
-        self.recovery_log.append(f"Recovered to {target_time}")
+        end = bisect.bisect_right(self.tx_timestamps, target_time)
+        replayed = sum(map(len, self.tx_operations[:end]))
+        self.recovery_log.append(
+            f"Recovered to {target_time} ({replayed} operations replayed)"
+        )
         return True
 
     def simulate_disaster_recovery(self) -> float:
@@ -980,9 +1461,8 @@ class MockBackupService:
 
 def get_backup_service(context) -> MockBackupService:
     """Get or create the backup service."""
-    if not hasattr(context, 'backup_service'):
-        context.backup_service = MockBackupService()
-    return context.backup_service
+    return _get_service(
+        context, 'backup', partial(MockBackupService, now_fn=partial(scenario_now, context)))
 
 
 @given("the backup schedule is daily at {time}")
@@ -1028,7 +1508,7 @@ def step_verify_retention(context):
     service = get_backup_service(context)
     service.rotate_backups()
     # All remaining backups should be within retention period
-    cutoff = datetime.now() - timedelta(days=service.retention_days)
+    cutoff = _to_epoch_us(scenario_now(context)) - service.retention_days * _US_PER_DAY
     for backup in service.backups:
         assert backup.timestamp > cutoff, "Found backup outside retention period"
 
@@ -1037,25 +1517,27 @@ def step_verify_retention(context):
 def step_create_past_backups(context, days):
     """Create backups for the past N days."""
     service = get_backup_service(context)
-    for i in range(days):
-        backup = Backup(
-            id=f"BACKUP-{i:04d}",
-            timestamp=datetime.now() - timedelta(days=i),
+    now_us = _to_epoch_us(scenario_now(context))
+    service.add_backups([
+        Backup(
+            id=service.next_backup_id(),
+            timestamp=now_us - i * _US_PER_DAY,
             location="/backups/offsite/",
             verified=True,
         )
-        service.backups.append(backup)
+        for i in range(days)
+    ])
 
 
 @given("transaction logs since last backup")
 def step_create_transaction_logs(context):
     """Create transaction logs."""
     service = get_backup_service(context)
-    for i in range(24):
-        service.transaction_logs.append({
-            'timestamp': datetime.now() - timedelta(hours=i),
-            'operations': [f"op-{j}" for j in range(10)],
-        })
+    now = scenario_now(context)
+    operations = tuple(f"op-{j}" for j in range(10))
+    # Oldest first, so each entry lands at the end of the ordered columns.
+    for i in range(23, -1, -1):
+        service.log_transactions(now - timedelta(hours=i), operations)
 
 
 @when("{persona} needs to recover to yesterday at {time}")
@@ -1063,7 +1545,7 @@ def step_recover_to_time(context, persona, time):
     """Attempt point-in-time recovery."""
     context.current_persona = persona
     service = get_backup_service(context)
-    target_time = datetime.now() - timedelta(days=1)
+    target_time = scenario_now(context) - timedelta(days=1)
     context.recovery_success = service.recover_to_point(target_time)
 
 
@@ -1135,8 +1617,7 @@ def step_run_restore_test(context):
     service = get_backup_service(context)
     # Create a test backup and verify it
     context.test_backup = service.create_backup()
-    service.verify_backup(context.test_backup.id)
-    context.restore_test_passed = True
+    context.restore_test_passed = service.verify_backup(context.test_backup.id)
 
 
 @then("a backup should be restored to a test environment")
@@ -1172,7 +1653,7 @@ def step_verify_test_report(context):
 # Data Lifecycle Steps - MVP-P2
 # =============================================================================
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class ArchivedProject:
     """Archived project data."""
     id: str
@@ -1186,7 +1667,8 @@ class ArchivedProject:
 class MockArchiveService:
     """Service for testing data lifecycle scenarios."""
 
-    def __init__(self):
+    def __init__(self, now_fn: Callable[[], datetime] = datetime.now):
+        self._now_fn = now_fn
         self.archived_projects: Dict[str, ArchivedProject] = {}
         self.deleted_items: Dict[str, Dict] = {}
         self.deletion_retention_days: int = 30
@@ -1196,7 +1678,7 @@ class MockArchiveService:
         archived = ArchivedProject(
             id=project_id,
             name=project_name,
-            archived_at=datetime.now(),
+            archived_at=self._now_fn(),
             location="cold-storage",
         )
         self.archived_projects[project_id] = archived
@@ -1204,21 +1686,25 @@ class MockArchiveService:
 
     def soft_delete(self, item_id: str, item_type: str) -> Dict:
         """Soft delete an item."""
+        now = self._now_fn()
         deleted_item = {
             'id': item_id,
             'type': item_type,
-            'deleted_at': datetime.now(),
-            'recoverable_until': datetime.now() + timedelta(days=self.deletion_retention_days),
+            'deleted_at': now,
+            'recoverable_until': now + timedelta(days=self.deletion_retention_days),
         }
         self.deleted_items[item_id] = deleted_item
         return deleted_item
 
+    def is_hidden(self, item_id: str) -> bool:
+        """Whether an item is excluded from normal listings."""
+        return item_id in self.deleted_items
+
 
 def get_archive_service(context) -> MockArchiveService:
     """Get or create the archive service."""
-    if not hasattr(context, 'archive_service'):
-        context.archive_service = MockArchiveService()
-    return context.archive_service
+    return _get_service(
+        context, 'archive', partial(MockArchiveService, now_fn=partial(scenario_now, context)))
 
 
 @given('project "{project_name}" completed {months:d} months ago')
@@ -1226,7 +1712,7 @@ def step_old_completed_project(context, project_name, months):
     """Create an old completed project."""
     context.old_project = {
         'name': project_name,
-        'completed_at': datetime.now() - timedelta(days=months * 30),
+        'completed_at': scenario_now(context) - timedelta(days=months * 30),
     }
 
 
@@ -1302,7 +1788,7 @@ def step_verify_hidden(context):
     """Verify deleted item is hidden from normal listings."""
     service = get_archive_service(context)
     # Deleted items are in a separate collection
-    assert context.deleted_exploration['id'] in service.deleted_items, \
+    assert service.is_hidden(context.deleted_exploration['id']), \
         "Deleted item not tracked properly"
 
 
@@ -1361,79 +1847,153 @@ def step_verify_downloadable(context):
 # Checkpoint and Versioning Steps - MVP-P1
 # =============================================================================
 
-@dataclass
+def _score_column(state: Dict) -> Dict[str, Optional[float]]:
+    """Map each thought id in a state to its score."""
+    return {tid: thought.get('score') for tid, thought in state.get('thoughts', {}).items()}
+
+
+def _freeze_state(state: Mapping) -> Mapping:
+    """Snapshot a state as a read-only view, one level of copying deep.
+
+    Checkpoints outlive the live state they were taken from, so they must
+    not alias it; copying the top level and the thoughts table is enough
+    since individual thoughts are replaced, not edited, by the steps.
+    """
+    frozen = dict(state)
+    if 'thoughts' in frozen:
+        frozen['thoughts'] = MappingProxyType(dict(frozen['thoughts']))
+    return MappingProxyType(frozen)
+
+
+def _thaw_state(state: Mapping) -> Dict:
+    """Return a mutable copy of a frozen state."""
+    thawed = dict(state)
+    if 'thoughts' in thawed:
+        thawed['thoughts'] = dict(thawed['thoughts'])
+    return thawed
+
+
+def _diff_scores(
+    current: Dict[str, Optional[float]],
+    checkpoint: Dict[str, Optional[float]],
+    checkpoint_keys: Optional[frozenset] = None,
+) -> Dict:
+    """Count added, removed and re-scored thoughts between two score columns."""
+    # Unchanged states are the common case; dict equality settles that in
+    # one C-level pass (and bails on a size mismatch) before any set work.
+    if current == checkpoint:
+        return {'added_thoughts': 0, 'removed_thoughts': 0, 'modified_scores': 0}
+    common = current.keys() & (checkpoint.keys() if checkpoint_keys is None else checkpoint_keys)
+    return {
+        'added_thoughts': len(current) - len(common),
+        'removed_thoughts': len(checkpoint) - len(common),
+        # map/ne keeps the per-thought comparison in C
+        'modified_scores': sum(map(
+            operator.ne,
+            map(current.__getitem__, common),
+            map(checkpoint.__getitem__, common),
+        )),
+    }
+
+
+@dataclass(**DATACLASS_SLOTS)
 class Checkpoint:
     """Named checkpoint of exploration state."""
     id: str
     name: str
     timestamp: datetime
     exploration_id: str
-    state: Dict
+    state: Mapping
+    # Precomputed from ``state`` when the checkpoint is registered
+    scores: Optional[Dict[str, Optional[float]]] = field(default=None, repr=False, compare=False)
+    thought_keys: Optional[frozenset] = field(default=None, repr=False, compare=False)
+
+
+# Short "T-<n>" ids used by the checkpoint scenarios, formatted once
+_CHECKPOINT_THOUGHT_IDS = tuple(f"T-{i}" for i in range(256))
 
 
 class MockCheckpointService:
     """Service for testing checkpoint scenarios."""
 
-    def __init__(self):
+    def __init__(self, now_fn: Callable[[], datetime] = datetime.now):
+        self._now_fn = now_fn
+        # Per-exploration checkpoints in timestamp order, with a parallel list
+        # of timestamps for bisecting range queries.
         self.checkpoints: Dict[str, List[Checkpoint]] = {}
+        self._timestamps: Dict[str, List[datetime]] = {}
+        self._by_name: Dict[str, Dict[str, Checkpoint]] = {}
         self.backup_states: Dict[str, Dict] = {}
         self.reversion_log: List[Dict] = []
 
     def create_checkpoint(self, exploration_id: str, name: str, state: Dict) -> Checkpoint:
         """Create a named checkpoint."""
-        if exploration_id not in self.checkpoints:
-            self.checkpoints[exploration_id] = []
-
         checkpoint = Checkpoint(
-            id=f"CP-{len(self.checkpoints[exploration_id]) + 1:04d}",
+            id=f"CP-{len(self.checkpoints.get(exploration_id, ())) + 1:04d}",
             name=name,
-            timestamp=datetime.now(),
+            timestamp=self._now_fn(),
             exploration_id=exploration_id,
             state=state,
         )
-        self.checkpoints[exploration_id].append(checkpoint)
+        return self.add_checkpoint(checkpoint)
+
+    def add_checkpoint(self, checkpoint: Checkpoint) -> Checkpoint:
+        """Register a checkpoint, freezing its state and keeping the indexes in sync."""
+        exploration_id = checkpoint.exploration_id
+        checkpoint.state = _freeze_state(checkpoint.state)
+        # Checkpoint state doesn't change, so index it once up front
+        checkpoint.scores = _score_column(checkpoint.state)
+        checkpoint.thought_keys = frozenset(checkpoint.scores)
+        timestamps = self._timestamps.setdefault(exploration_id, [])
+        i = bisect.bisect_right(timestamps, checkpoint.timestamp)
+        timestamps.insert(i, checkpoint.timestamp)
+        self.checkpoints.setdefault(exploration_id, []).insert(i, checkpoint)
+        self._by_name.setdefault(exploration_id, {})[checkpoint.name] = checkpoint
         return checkpoint
 
+    def find_checkpoint(self, exploration_id: str, name: str) -> Optional[Checkpoint]:
+        """Look up a checkpoint by name."""
+        return self._by_name.get(exploration_id, {}).get(name)
+
     def get_checkpoints(self, exploration_id: str) -> List[Checkpoint]:
         """Get all checkpoints for an exploration."""
         return self.checkpoints.get(exploration_id, [])
 
+    def get_checkpoints_since(self, exploration_id: str, cutoff: datetime) -> List[Checkpoint]:
+        """Get checkpoints taken at or after the cutoff, oldest first."""
+        i = bisect.bisect_left(self._timestamps.get(exploration_id, ()), cutoff)
+        return self.checkpoints.get(exploration_id, [])[i:]
+
     def revert_to_checkpoint(self, exploration_id: str, checkpoint_name: str, current_state: Dict) -> Optional[Dict]:
         """Revert to a named checkpoint."""
-        checkpoints = self.get_checkpoints(exploration_id)
-        for cp in checkpoints:
-            if cp.name == checkpoint_name:
-                # Save current state as backup
-                self.backup_states[exploration_id] = current_state
-                # Log reversion
-                self.reversion_log.append({
-                    'exploration_id': exploration_id,
-                    'checkpoint_name': checkpoint_name,
-                    'reverted_at': datetime.now(),
-                })
-                return cp.state
-        return None
+        cp = self.find_checkpoint(exploration_id, checkpoint_name)
+        if cp is None:
+            return None
+        # Save current state as backup
+        self.backup_states[exploration_id] = current_state
+        # Log reversion
+        self.reversion_log.append({
+            'exploration_id': exploration_id,
+            'checkpoint_name': checkpoint_name,
+            'reverted_at': self._now_fn(),
+        })
+        return _thaw_state(cp.state)
 
     def compare_states(self, current: Dict, checkpoint: Dict) -> Dict:
         """Compare current state to checkpoint."""
-        current_thoughts = set(current.get('thoughts', {}).keys())
-        checkpoint_thoughts = set(checkpoint.get('thoughts', {}).keys())
+        return _diff_scores(_score_column(current), _score_column(checkpoint))
 
-        return {
-            'added_thoughts': len(current_thoughts - checkpoint_thoughts),
-            'removed_thoughts': len(checkpoint_thoughts - current_thoughts),
-            'modified_scores': sum(
-                1 for t in current_thoughts & checkpoint_thoughts
-                if current['thoughts'][t].get('score') != checkpoint['thoughts'][t].get('score')
-            ),
-        }
+    def compare_to_checkpoint(self, current: Dict, checkpoint: Checkpoint) -> Dict:
+        """Compare current state to a checkpoint, reusing its precomputed index."""
+        if checkpoint.scores is None:
+            return self.compare_states(current, checkpoint.state)
+        return _diff_scores(_score_column(current), checkpoint.scores, checkpoint.thought_keys)
 
 
 def get_checkpoint_service(context) -> MockCheckpointService:
     """Get or create the checkpoint service."""
-    if not hasattr(context, 'checkpoint_service'):
-        context.checkpoint_service = MockCheckpointService()
-    return context.checkpoint_service
+    return _get_service(
+        context, 'checkpoint', partial(MockCheckpointService, now_fn=partial(scenario_now, context)))
 
 
 @given("{persona} has an exploration at a significant milestone")
@@ -1441,9 +2001,10 @@ def step_exploration_milestone(context, persona):
     """Set up exploration at milestone."""
     context.current_persona = persona
     context.current_exploration_id = "EXP-MILESTONE"
+    ids = _CHECKPOINT_THOUGHT_IDS
     context.current_exploration_state = {
-        'thoughts': {f"T-{i}": {'id': f"T-{i}", 'score': 0.5} for i in range(20)},
-        'edges': [(f"T-{i}", f"T-{i+1}") for i in range(19)],
+        'thoughts': {tid: {'id': tid, 'score': 0.5} for tid in ids[:20]},
+        'edges': list(zip(ids[:19], ids[1:20])),
     }
 
 
@@ -1476,10 +2037,10 @@ def step_verify_checkpoint_timestamp(context):
 def step_verify_checkpoint_listed(context):
     """Verify checkpoint is listed."""
     service = get_checkpoint_service(context)
-    checkpoints = service.get_checkpoints(context.current_exploration_id)
-    checkpoint_names = [cp.name for cp in checkpoints]
-    assert context.created_checkpoint.name in checkpoint_names, \
-        "Checkpoint not in list"
+    listed = service.find_checkpoint(
+        context.current_exploration_id, context.created_checkpoint.name
+    )
+    assert listed is not None, "Checkpoint not in list"
 
 
 @given("checkpoints")
@@ -1488,6 +2049,7 @@ def step_setup_checkpoints(context):
     """Set up checkpoints from table."""
     service = get_checkpoint_service(context)
     context.current_exploration_id = "EXP-TEST"
+    ids = _CHECKPOINT_THOUGHT_IDS
 
     for row in context.table:
         name = row['name']
@@ -1499,16 +2061,13 @@ def step_setup_checkpoints(context):
             name=name,
             timestamp=datetime.strptime(date_str, "%Y-%m-%d"),
             exploration_id=context.current_exploration_id,
-            state={'thoughts': {f"T-{i}": {'id': f"T-{i}", 'score': 0.5} for i in range(10)}},
+            state={'thoughts': {tid: {'id': tid, 'score': 0.5} for tid in ids[:10]}},
         )
-
-        if context.current_exploration_id not in service.checkpoints:
-            service.checkpoints[context.current_exploration_id] = []
-        service.checkpoints[context.current_exploration_id].append(checkpoint)
+        service.add_checkpoint(checkpoint)
 
     # Set current state (different from checkpoints)
     context.current_exploration_state = {
-        'thoughts': {f"T-{i}": {'id': f"T-{i}", 'score': 0.7} for i in range(15)},
+        'thoughts': {tid: {'id': tid, 'score': 0.7} for tid in ids[:15]},
     }
 
 
@@ -1550,41 +2109,39 @@ def step_old_checkpoint(context, days):
     """Create an old checkpoint."""
     service = get_checkpoint_service(context)
     context.current_exploration_id = "EXP-COMPARE"
+    ids = _CHECKPOINT_THOUGHT_IDS
 
     # Old checkpoint state: T-0 through T-12 (13 thoughts)
     # We need: 12 added, 3 removed, 8 modified
     old_state = {
         'thoughts': {
-            f"T-{i}": {'id': f"T-{i}", 'score': 0.5}
-            for i in range(13)  # T-0 to T-12
+            tid: {'id': tid, 'score': 0.5}
+            for tid in ids[:13]  # T-0 to T-12
         },
     }
 
     checkpoint = Checkpoint(
         id="CP-OLD",
         name="Old Checkpoint",
-        timestamp=datetime.now() - timedelta(days=days),
+        timestamp=scenario_now(context) - timedelta(days=days),
         exploration_id=context.current_exploration_id,
         state=old_state,
     )
 
-    service.checkpoints[context.current_exploration_id] = [checkpoint]
+    service.add_checkpoint(checkpoint)
     context.old_checkpoint = checkpoint
 
     # Current state:
     # - Keep T-0 to T-9 (10 thoughts from old) - removes T-10, T-11, T-12 (3 removed)
     # - Modify scores on 8 of them (T-0 to T-7 get new scores)
     # - Add T-13 to T-24 (12 new thoughts)
-    current_thoughts = {}
-    # Overlapping thoughts with some modified scores
-    for i in range(10):  # T-0 to T-9 (keeps 10, removes T-10, T-11, T-12 = 3 removed)
-        if i < 8:  # T-0 to T-7 have modified scores (8 modified)
-            current_thoughts[f"T-{i}"] = {'id': f"T-{i}", 'score': 0.8}
-        else:  # T-8, T-9 keep original score
-            current_thoughts[f"T-{i}"] = {'id': f"T-{i}", 'score': 0.5}
-    # Add 12 new thoughts
-    for i in range(13, 25):  # T-13 to T-24 (12 added)
-        current_thoughts[f"T-{i}"] = {'id': f"T-{i}", 'score': 0.6}
+    # T-0 to T-7 have modified scores (8 modified); T-8, T-9 keep the original
+    current_thoughts = {
+        tid: {'id': tid, 'score': 0.8 if i < 8 else 0.5}
+        for i, tid in enumerate(ids[:10])
+    }
+    # Add 12 new thoughts: T-13 to T-24
+    current_thoughts.update({tid: {'id': tid, 'score': 0.6} for tid in ids[13:25]})
 
     context.current_exploration_state = {'thoughts': current_thoughts}
 
@@ -1594,9 +2151,9 @@ def step_compare_to_checkpoint(context, persona):
     """Compare current state to checkpoint."""
     context.current_persona = persona
     service = get_checkpoint_service(context)
-    context.comparison = service.compare_states(
+    context.comparison = service.compare_to_checkpoint(
         context.current_exploration_state,
-        context.old_checkpoint.state,
+        context.old_checkpoint,
     )
 
 
@@ -1604,12 +2161,14 @@ def step_compare_to_checkpoint(context, persona):
 @then("differences should be highlighted:")
 def step_verify_differences(context):
     """Verify differences are shown."""
-    assert context.comparison is not None, "No comparison result"
+    comparison = context.comparison
+    assert comparison is not None, "No comparison result"
 
+    get = comparison.get
     for row in context.table:
         change_type = row['change_type']
         expected_count = int(row['count'])
-        actual_count = context.comparison.get(change_type, 0)
+        actual_count = get(change_type, 0)
         assert actual_count == expected_count, \
             f"{change_type}: expected {expected_count}, got {actual_count}"
 
@@ -1618,12 +2177,15 @@ def step_verify_differences(context):
 # Multi-Tenant Steps - MVP-P2
 # =============================================================================
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class Tenant:
     """Tenant in multi-tenant system."""
     id: str
     name: str
-    projects: List[str] = field(default_factory=list)
+    # Project names are derived from the prefix and only built on first query
+    projects: Optional[List[str]] = None
+    prefix: str = ""
+    project_count: int = 0
 
 
 class MockMultiTenantService:
@@ -1638,7 +2200,8 @@ class MockMultiTenantService:
         tenant = Tenant(
             id=f"TENANT-{name}",
             name=name,
-            projects=[f"{name}-Project-1", f"{name}-Project-2"],
+            prefix=name + "-",
+            project_count=2,
         )
         self.tenants[name] = tenant
         return tenant
@@ -1651,14 +2214,27 @@ class MockMultiTenantService:
         """Get projects for current tenant only."""
         if not self.current_tenant or self.current_tenant not in self.tenants:
             return []
-        return self.tenants[self.current_tenant].projects
+        tenant = self.tenants[self.current_tenant]
+        if tenant.projects is None:
+            template = tenant.prefix + "Project-%d"
+            tenant.projects = [template % i for i in range(1, tenant.project_count + 1)]
+        return tenant.projects
+
+    @staticmethod
+    def all_start_with(projects: List[str], prefix: str) -> bool:
+        """Check every project name carries the prefix.
+
+        Names sharing a prefix form one contiguous range in sorted order,
+        so checking the lexicographic min and max covers the whole list.
+        """
+        if not projects:
+            return True
+        return min(projects).startswith(prefix) and max(projects).startswith(prefix)
 
 
 def get_multitenant_service(context) -> MockMultiTenantService:
     """Get or create the multi-tenant service."""
-    if not hasattr(context, 'multitenant_service'):
-        context.multitenant_service = MockMultiTenantService()
-    return context.multitenant_service
+    return _get_service(context, 'multitenant', MockMultiTenantService)
 
 
 @given('tenants "{tenant1}" and "{tenant2}"')
@@ -1683,17 +2259,19 @@ def step_query_as_tenant(context, tenant):
 @then('only "{tenant}" projects should be returned')
 def step_verify_tenant_projects(context, tenant):
     """Verify only tenant's projects returned."""
-    for project in context.queried_projects:
-        assert project.startswith(tenant), \
-            f"Project {project} doesn't belong to {tenant}"
+    service = get_multitenant_service(context)
+    projects = context.queried_projects
+    assert projects, f"No projects returned for {tenant}"
+    assert service.all_start_with(projects, service.tenants[tenant].prefix), \
+        f"Projects {projects} don't all belong to {tenant}"
 
 
 @then('"{other_tenant}" data should never be accessible')
 def step_verify_isolation(context, other_tenant):
     """Verify other tenant's data is not accessible."""
-    for project in context.queried_projects:
-        assert not project.startswith(other_tenant), \
-            f"Found {other_tenant}'s project: {project}"
+    prefix = other_tenant + "-"
+    leaked = [p for p in context.queried_projects if p.startswith(prefix)]
+    assert not leaked, f"Found {other_tenant}'s projects: {leaked}"
 
 
 @then("database queries should include tenant filtering")
@@ -11,15 +11,18 @@ These are Application-level steps that test business workflows with personas.
 """
 
 from behave import given, when, then, use_step_matcher
+from collections import defaultdict
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Sequence
 from datetime import datetime, timedelta
 from enum import Enum
-import uuid
+from itertools import count
 
 # Import shared enums from domain layer
 from graph_of_thought.domain.enums import ChunkStatus
 
+from features.steps.compat import DATACLASS_SLOTS
+
 use_step_matcher("parse")
 
 
@@ -37,7 +40,7 @@ class ProjectStatus(Enum):
     ARCHIVED = "archived"
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class Project:
     """An AI-assisted project."""
     id: str
@@ -51,17 +54,18 @@ class Project:
     current_focus: Optional[str] = None
     focus_start_time: Optional[datetime] = None
     created_at: datetime = field(default_factory=datetime.now)
-    work_chunks: List[str] = field(default_factory=list)
+    # Chunk ids and team members are insertion-ordered sets (dict keys)
+    work_chunks: Dict[str, None] = field(default_factory=dict)
     decisions_made: int = 0
     questions_pending: int = 0
-    team_members: List[str] = field(default_factory=list)
+    team_members: Dict[str, None] = field(default_factory=dict)
 
     @property
     def tokens_remaining(self) -> int:
         return self.token_budget - self.tokens_used
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class WorkChunk:
     """A focused work session of 2-4 hours."""
     id: str
@@ -84,19 +88,20 @@ class WorkChunk:
         return int((datetime.now() - self.start_time).total_seconds() / 60)
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class SessionHandoff:
     """A handoff package for session continuity."""
     id: str
     project_id: str
     current_intent: str
-    key_decisions: List[str] = field(default_factory=list)
-    pending_items: List[str] = field(default_factory=list)
-    critical_context: List[str] = field(default_factory=list)
+    # Read-only once created, so an empty tuple default is safe to share
+    key_decisions: Sequence[str] = ()
+    pending_items: Sequence[str] = ()
+    critical_context: Sequence[str] = ()
     created_at: datetime = field(default_factory=datetime.now)
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class User:
     """A user in the project management system."""
     name: str
@@ -104,6 +109,18 @@ class User:
     projects: List[str] = field(default_factory=list)
 
 
+@dataclass(**DATACLASS_SLOTS)
+class DashboardSnapshot:
+    """Project metrics as shown on the dashboard."""
+    work_chunks: int
+    tokens_used: int
+    tokens_remaining: int
+    decisions_made: int
+    questions_pending: int
+    status: str
+    objective: str
+
+
 # =============================================================================
 # Mock Project Management Service
 # =============================================================================
@@ -112,41 +129,64 @@ class MockProjectManagementService:
     """Mock implementation of project management service for testing."""
 
     def __init__(self):
-        self.projects: Dict[str, Project] = {}
+        self.projects_by_id: Dict[str, Project] = {}
+        self.projects_by_name: Dict[str, Project] = {}
         self.work_chunks: Dict[str, WorkChunk] = {}
-        self.handoffs: Dict[str, SessionHandoff] = {}
+        self.handoffs_by_id: Dict[str, SessionHandoff] = {}
+        self.handoffs_by_project: Dict[str, SessionHandoff] = {}
         self.users: Dict[str, User] = {}
         self.notifications: List[Dict] = []
+        self.notifications_by_type: Dict[str, List[Dict]] = defaultdict(list)
         self.knowledge_base: List[Dict] = []
+        self.knowledge_by_type: Dict[str, List[Dict]] = defaultdict(list)
         self.context_window_usage: float = 0.0
+        # Sequential ids are unique per service, which is all the mocks need
+        self._project_seq = count(1)
+        self._chunk_seq = count(1)
+        self._handoff_seq = count(1)
 
     def create_project(self, name: str, objective: str, team: str,
                        token_budget: int, target_date: str = None,
                        created_by: str = None) -> Project:
         """Create a new project."""
+        now = datetime.now()
         project = Project(
-            id=f"PRJ-{uuid.uuid4().hex[:8].upper()}",
+            id="PRJ-%08X" % next(self._project_seq),
             name=name,
             objective=objective,
             team=team,
             token_budget=token_budget,
-            target_date=target_date
+            target_date=target_date,
+            created_at=now
         )
-        self.projects[project.id] = project
-        self.projects[name] = project  # Also index by name
+        self.projects_by_id[project.id] = project
+        self.projects_by_name[name] = project
 
         # Notify team members
         self._notify_team(team, "project_created", {
             "project": name,
             "objective": objective,
             "created_by": created_by
-        })
+        }, timestamp=now)
 
         return project
 
+    def ensure_user(self, name: str, role: Optional[str] = None) -> User:
+        """Get a user, registering them with their persona role if new."""
+        user = self.users.get(name)
+        if user is None:
+            user = self.users[name] = User(
+                name=name,
+                role=role or PERSONA_ROLES.get(name, "team-member")
+            )
+        return user
+
     def get_project(self, name_or_id: str) -> Optional[Project]:
         """Get a project by name or ID."""
-        return self.projects.get(name_or_id)
+        project = self.projects_by_id.get(name_or_id)
+        if project is None:
+            project = self.projects_by_name.get(name_or_id)
+        return project
 
     def update_project_focus(self, project: Project, focus: str):
         """Update project's current focus."""
@@ -157,72 +197,111 @@ class MockProjectManagementService:
     def create_work_chunk(self, project: Project, description: str,
                           assignee: str) -> WorkChunk:
         """Create a new work chunk."""
-        chunk = WorkChunk(
-            id=f"CHK-{uuid.uuid4().hex[:8].upper()}",
-            project_id=project.id,
-            description=description,
-            assignee=assignee,
-            intent=description
-        )
-        self.work_chunks[chunk.id] = chunk
-        project.work_chunks.append(chunk.id)
-
-        return chunk
+        return self.create_work_chunks(project, [description], assignee)[0]
+
+    def create_work_chunks(self, project: Project, descriptions: List[str],
+                           assignee: str,
+                           status: ChunkStatus = ChunkStatus.ACTIVE) -> List[WorkChunk]:
+        """Create several work chunks at once, sharing one start time."""
+        now = datetime.now()
+        chunks = [
+            WorkChunk(
+                id="CHK-%08X" % next(self._chunk_seq),
+                project_id=project.id,
+                description=description,
+                assignee=assignee,
+                status=status,
+                intent=description,
+                start_time=now
+            )
+            for description in descriptions
+        ]
+        self.work_chunks.update((chunk.id, chunk) for chunk in chunks)
+        project.work_chunks.update(dict.fromkeys(chunk.id for chunk in chunks))
+
+        return chunks
 
     def complete_chunk(self, chunk: WorkChunk, summary: str):
         """Complete a work chunk with summary."""
         chunk.status = ChunkStatus.COMPLETED
         chunk.summary = summary
-        chunk.end_time = datetime.now()
+        chunk.end_time = now = datetime.now()
 
         # Add to knowledge base
-        self.knowledge_base.append({
+        self._record_knowledge({
             "type": "chunk_completion",
             "chunk_id": chunk.id,
             "summary": summary,
-            "timestamp": datetime.now()
+            "timestamp": now
         })
 
+    def _record_knowledge(self, entry: Dict):
+        """Store a knowledge-base entry and index it by type."""
+        self.knowledge_base.append(entry)
+        self.knowledge_by_type[entry["type"]].append(entry)
+
     def create_handoff(self, project: Project, current_intent: str,
                        key_decisions: List[str] = None,
                        pending_items: List[str] = None,
                        critical_context: List[str] = None) -> SessionHandoff:
         """Create a session handoff package."""
         handoff = SessionHandoff(
-            id=f"HND-{uuid.uuid4().hex[:8].upper()}",
+            id="HND-%08X" % next(self._handoff_seq),
             project_id=project.id,
             current_intent=current_intent,
-            key_decisions=key_decisions or [],
-            pending_items=pending_items or [],
-            critical_context=critical_context or []
+            key_decisions=key_decisions or (),
+            pending_items=pending_items or (),
+            critical_context=critical_context or ()
         )
-        self.handoffs[handoff.id] = handoff
-        self.handoffs[project.id] = handoff  # Index by project for easy lookup
+        self.handoffs_by_id[handoff.id] = handoff
+        self.handoffs_by_project[project.id] = handoff
+
+        return handoff
+
+    def create_handoff_with_notify(self, project: Project, user: str,
+                                   current_intent: str,
+                                   **sections: List[str]) -> SessionHandoff:
+        """Create a handoff and tell the user their context will be compressed.
 
+        The notification carries the handoff's own creation time, so both
+        records agree on when the handoff happened.
+        """
+        handoff = self.create_handoff(project, current_intent, **sections)
+        self.notify_user(user, "context_compression", {
+            "message": "Context will be compressed",
+            "handoff_id": handoff.id
+        }, timestamp=handoff.created_at)
         return handoff
 
     def get_last_session_handoff(self, project: Project) -> Optional[SessionHandoff]:
         """Get the last handoff for a project."""
-        return self.handoffs.get(project.id)
+        return self.handoffs_by_project.get(project.id)
 
-    def _notify_team(self, team: str, notification_type: str, content: Dict):
+    def _notify_team(self, team: str, notification_type: str, content: Dict,
+                     timestamp: Optional[datetime] = None):
         """Notify team members."""
-        self.notifications.append({
+        self._record_notification({
             "team": team,
             "type": notification_type,
             "content": content,
-            "timestamp": datetime.now()
+            "timestamp": timestamp or datetime.now()
         })
 
-    def notify_user(self, user: str, notification_type: str, content: Dict):
+    def notify_user(self, user: str, notification_type: str, content: Dict,
+                    timestamp: Optional[datetime] = None):
         """Notify a specific user."""
-        self.notifications.append({
+        self._record_notification({
             "to": user,
             "type": notification_type,
             "content": content,
-            "timestamp": datetime.now()
+            "timestamp": timestamp or datetime.now()
         })
 
+    def _record_notification(self, notification: Dict):
+        """Store a notification and index it by type."""
+        self.notifications.append(notification)
+        self.notifications_by_type[notification["type"]].append(notification)
+
 
 # =============================================================================
 # Persona Role Mapping
@@ -260,23 +339,17 @@ def step_create_project_with_table(context, persona, project_name):
     service = get_project_service(context)
 
     # Ensure user exists in project service
-    if persona not in service.users:
-        service.users[persona] = User(
-            name=persona,
-            role="engineering-manager"
-        )
+    service.ensure_user(persona, role="engineering-manager")
 
     # Parse table data
-    project_data = {}
-    for row in context.table:
-        project_data[row['field']] = row['value']
+    get = {row['field']: row['value'] for row in context.table}.get
 
     project = service.create_project(
         name=project_name,
-        objective=project_data.get('objective', ''),
-        team=project_data.get('team', ''),
-        token_budget=int(project_data.get('token_budget', 0)),
-        target_date=project_data.get('target_date'),
+        objective=get('objective', ''),
+        team=get('team', ''),
+        token_budget=int(get('token_budget', 0)),
+        target_date=get('target_date'),
         created_by=persona
     )
     context.current_project = project
@@ -286,7 +359,7 @@ def step_create_project_with_table(context, persona, project_name):
 def step_project_created_with_status(context, status):
     """Verify project was created with expected status."""
     assert context.current_project is not None, "No project was created"
-    assert context.current_project.status.value == status, \
+    assert context.current_project.status is ProjectStatus(status), \
         f"Expected status '{status}', got '{context.current_project.status.value}'"
 
 
@@ -307,9 +380,7 @@ def step_token_budget_allocated(context):
 def step_team_notified_new_project(context):
     """Verify team was notified."""
     service = get_project_service(context)
-    notifications = [n for n in service.notifications
-                     if n["type"] == "project_created"]
-    assert len(notifications) > 0, "Team was not notified"
+    assert service.notifications_by_type.get("project_created"), "Team was not notified"
 
 
 # =============================================================================
@@ -357,7 +428,7 @@ def step_start_time_recorded(context):
 @then('the project status should show "{status}"')
 def step_project_status_shows(context, status):
     """Verify project status."""
-    assert context.current_project.status.value == status, \
+    assert context.current_project.status is ProjectStatus(status), \
         f"Expected status '{status}', got '{context.current_project.status.value}'"
 
 
@@ -373,37 +444,38 @@ def step_view_project_dashboard(context, persona):
     context.current_persona = persona
     project = context.current_project
 
-    context.dashboard_data = {
-        "work_chunks": len(project.work_chunks),
-        "tokens_used": project.tokens_used,
-        "tokens_remaining": project.tokens_remaining,
-        "decisions_made": project.decisions_made,
-        "questions_pending": project.questions_pending,
-        "status": project.status.value,
-        "objective": project.objective
-    }
+    context.dashboard_data = DashboardSnapshot(
+        work_chunks=len(project.work_chunks),
+        tokens_used=project.tokens_used,
+        tokens_remaining=project.tokens_remaining,
+        decisions_made=project.decisions_made,
+        questions_pending=project.questions_pending,
+        status=project.status.value,
+        objective=project.objective
+    )
 
 
 @then("all metrics should be displayed")
 def step_all_metrics_displayed(context):
     """Verify all metrics are displayed."""
-    assert "work_chunks" in context.dashboard_data
-    assert "tokens_used" in context.dashboard_data
-    assert "tokens_remaining" in context.dashboard_data
-    assert "decisions_made" in context.dashboard_data
-    assert "questions_pending" in context.dashboard_data
+    dashboard = context.dashboard_data
+    assert dashboard.work_chunks is not None
+    assert dashboard.tokens_used is not None
+    assert dashboard.tokens_remaining is not None
+    assert dashboard.decisions_made is not None
+    assert dashboard.questions_pending is not None
 
 
 @then("progress toward objective should be shown")
 def step_progress_shown(context):
     """Verify progress is shown."""
-    assert "objective" in context.dashboard_data
+    assert context.dashboard_data.objective is not None
 
 
 @then("pending blockers should be highlighted")
 def step_blockers_highlighted(context):
     """Verify blockers are highlighted."""
-    assert "questions_pending" in context.dashboard_data
+    assert context.dashboard_data.questions_pending is not None
 
 
 # =============================================================================
@@ -432,14 +504,10 @@ def step_given_project(context, project_name):
 def step_persona_assigned(context, persona):
     """Assign persona to project."""
     context.current_persona = persona
-    context.current_project.team_members.append(persona)
+    context.current_project.team_members[persona] = None
 
     service = get_project_service(context)
-    if persona not in service.users:
-        service.users[persona] = User(
-            name=persona,
-            role=PERSONA_ROLES.get(persona, "team-member")
-        )
+    service.ensure_user(persona)
 
 
 @when('{persona} starts a work chunk "{description}"')
@@ -460,7 +528,7 @@ def step_start_work_chunk(context, persona, description):
 def step_chunk_created_with_status(context, status):
     """Verify chunk was created with expected status."""
     assert context.current_chunk is not None, "No chunk was created"
-    assert context.current_chunk.status.value == status, \
+    assert context.current_chunk.status is ChunkStatus(status), \
         f"Expected status '{status}', got '{context.current_chunk.status.value}'"
 
 
@@ -531,7 +599,7 @@ def step_complete_chunk_with_summary(context, persona):
 @then('the chunk should be marked as "{status}"')
 def step_chunk_marked_status(context, status):
     """Verify chunk status."""
-    assert context.current_chunk.status.value == status, \
+    assert context.current_chunk.status is ChunkStatus(status), \
         f"Expected status '{status}', got '{context.current_chunk.status.value}'"
 
 
@@ -539,9 +607,8 @@ def step_chunk_marked_status(context, status):
 def step_summary_saved(context):
     """Verify summary was saved."""
     service = get_project_service(context)
-    knowledge_entries = [k for k in service.knowledge_base
-                         if k.get("type") == "chunk_completion"]
-    assert len(knowledge_entries) > 0, "Summary not saved to knowledge base"
+    assert service.knowledge_by_type.get("chunk_completion"), \
+        "Summary not saved to knowledge base"
 
 
 @then("total duration and tokens used should be recorded")
@@ -590,20 +657,14 @@ def step_context_window_capacity(context, percent):
 
     # Auto-prepare handoff when threshold reached
     if service.context_window_usage >= 0.8:
-        handoff = service.create_handoff(
+        context.current_handoff = service.create_handoff_with_notify(
             project=context.current_project,
+            user="current_user",
             current_intent="Continue current analysis",
             key_decisions=["Decided to use Redis", "Cache TTL set to 5 minutes"],
             pending_items=["Test under load", "Review error handling"],
             critical_context=["API latency target: 100ms", "Redis cluster mode enabled"]
         )
-        context.current_handoff = handoff
-
-        # Notify user
-        service.notify_user("current_user", "context_compression", {
-            "message": "Context will be compressed",
-            "handoff_id": handoff.id
-        })
 
 
 @then("a handoff package should be automatically prepared")
@@ -613,6 +674,11 @@ def step_handoff_prepared(context):
     assert context.current_handoff is not None
 
 
+_HANDOFF_FIELDS = frozenset({
+    'current_intent', 'key_decisions', 'pending_items', 'critical_context',
+})
+
+
 @then("it should include")
 @then("it should include:")
 def step_handoff_includes(context):
@@ -621,24 +687,18 @@ def step_handoff_includes(context):
 
     for row in context.table:
         content_type = row['content']
-        # Verify the field exists in the handoff
-        if content_type == 'current_intent':
-            assert handoff.current_intent is not None
-        elif content_type == 'key_decisions':
-            assert len(handoff.key_decisions) >= 0
-        elif content_type == 'pending_items':
-            assert len(handoff.pending_items) >= 0
-        elif content_type == 'critical_context':
-            assert len(handoff.critical_context) >= 0
+        assert content_type in _HANDOFF_FIELDS, \
+            f"Unknown handoff content '{content_type}'"
+        assert getattr(handoff, content_type) is not None, \
+            f"Handoff is missing {content_type}"
 
 
 @then("the user should be notified that context will be compressed")
 def step_user_notified_compression(context):
     """Verify user was notified about compression."""
     service = get_project_service(context)
-    notifications = [n for n in service.notifications
-                     if n.get("type") == "context_compression"]
-    assert len(notifications) > 0, "User not notified about context compression"
+    assert service.notifications_by_type.get("context_compression"), \
+        "User not notified about context compression"
 
 
 # =============================================================================
@@ -661,11 +721,8 @@ def step_persona_had_session(context, persona, project_name):
     context.current_project = project
 
     # Assign persona
-    project.team_members.append(persona)
-    service.users[persona] = User(
-        name=persona,
-        role=PERSONA_ROLES.get(persona, "team-member")
-    )
+    project.team_members[persona] = None
+    service.ensure_user(persona)
 
 
 @given('the session ended with intent "{intent}"')
@@ -5,12 +5,124 @@ These steps wrap the GraphOfThought search API to provide business-focused
 BDD scenarios with personas like Jordan (Data Scientist).
 """
 
-import asyncio
+import re
+from dataclasses import dataclass
+from functools import lru_cache
 from behave import given, when, then, use_step_matcher
 from graph_of_thought import SearchConfig
 
+from features.steps.helpers import run_async
+
 use_step_matcher("parse")
 
+# Search settings a fresh exploration starts from; steps copy before editing
+_DEFAULT_SEARCH_CONFIG = {
+    "budget_tokens": None,
+    "beam_width": 3,
+    "max_depth": 10,
+    "timeout_seconds": None,
+    "goal_condition": None,
+}
+
+# Goal conditions like "solution score above 0.9"
+_GOAL_THRESHOLD_RE = re.compile(r"score\s+above\s+([0-9]*\.?[0-9]+)")
+
+# Termination reasons accepted by the outcome assertions
+_DEPTH_REASONS = frozenset({"max_depth", "depth_limit", "completed"})
+_TIMEOUT_REASONS = frozenset({"timeout", "completed", "max_depth", "max_expansions"})
+
+# Business wording in feature files mapped to technical termination reasons
+_REASON_MAP = {
+    "No viable paths remaining": frozenset({"completed", "no_viable_paths"}),
+}
+
+
+@dataclass
+class MockThought:
+    """Path entry handed to mock LLM generators, which only read ``content``."""
+    __slots__ = ('content',)
+    content: str
+
+
+# getattr default for optional result fields, distinct from a stored None
+_MISSING = object()
+
+
+@lru_cache(maxsize=128)
+def _make_search_config(beam_width, max_depth, max_expansions, timeout_seconds) -> SearchConfig:
+    """Build a SearchConfig; searches only read it, so instances are shared."""
+    return SearchConfig(
+        beam_width=beam_width,
+        max_depth=max_depth,
+        max_expansions=max_expansions,
+        timeout_seconds=timeout_seconds,
+    )
+
+
+@lru_cache(maxsize=32)
+def _goal_at(threshold: float):
+    """Goal predicate accepting thoughts scored at or above ``threshold``."""
+    def is_goal(thought, threshold=threshold):
+        score = thought.score
+        return score >= threshold if score else False
+    return is_goal
+
+
+def _search_config(cfg: dict) -> SearchConfig:
+    """SearchConfig for a scenario's search settings."""
+    return _make_search_config(
+        cfg["beam_width"],
+        cfg["max_depth"],
+        cfg.get("max_expansions", 50),
+        cfg.get("timeout_seconds"),
+    )
+
+
+def _run_search(context, tokens_per_expansion: int, goal=None) -> None:
+    """Beam-search the scenario graph, recording the result, error and token estimate."""
+    try:
+        result = run_async(context, context.graph.beam_search(
+            config=_search_config(context.search_config),
+            goal=goal,
+        ))
+        context.search_result = result
+        context.search_error = None
+
+        stats = getattr(result, 'stats', _MISSING)
+        if stats is not _MISSING:
+            context.tokens_used = stats.get('expansions_count', 0) * tokens_per_expansion
+        else:
+            context.tokens_used = len(context.graph) * tokens_per_expansion
+
+    except Exception as e:
+        context.search_error = e
+        context.search_result = None
+
+
+def _expand_current(context) -> None:
+    """Expand the current thought, recording the new children or the error."""
+    try:
+        # expand() returns the children it just added
+        result = run_async(context, context.graph.expand(context.current_thought.id))
+        context.expansion_result = result
+        context.expansion_error = None
+        context.generated_thoughts = result
+    except Exception as e:
+        context.expansion_error = e
+        context.expansion_result = None
+        context.generated_thoughts = []
+
+
+def _thought_index(context) -> dict:
+    """Scenario-wide content -> thought lookup, created on first use.
+
+    Every thought lives in the same scenario graph, so setup steps add to
+    one index rather than replacing it with a fresh single-entry dict.
+    """
+    if 'thoughts_by_content' not in context:
+        context.thoughts_by_content = {}
+    return context.thoughts_by_content
+
 
 # =============================================================================
 # Search Setup and Configuration
@@ -21,37 +133,25 @@ def step_persona_starts_exploring_search(context, persona, problem):
     """Start an exploration session for search."""
     context.current_persona = persona
     context.current_problem = problem
-    context.search_config = {
-        "budget_tokens": None,
-        "beam_width": 3,
-        "max_depth": 10,
-        "timeout_seconds": None,
-        "goal_condition": None,
-    }
+    context.search_config = _DEFAULT_SEARCH_CONFIG.copy()
     context.tokens_used = 0
 
     # Create root thought
     thought = context.graph.add_thought(problem)
     context.root_thought_id = thought.id
-    context.thoughts_by_content = {problem: thought}
+    _thought_index(context)[problem] = thought
 
 
 @given("an exploration for \"{problem}\"")
 def step_exploration_for_problem(context, problem):
     """Set up an exploration for a problem (without persona context)."""
     context.current_problem = problem
-    context.search_config = {
-        "budget_tokens": None,
-        "beam_width": 3,
-        "max_depth": 10,
-        "timeout_seconds": None,
-        "goal_condition": None,
-    }
+    context.search_config = _DEFAULT_SEARCH_CONFIG.copy()
     context.tokens_used = 0
 
     thought = context.graph.add_thought(problem)
     context.root_thought_id = thought.id
-    context.thoughts_by_content = {problem: thought}
+    _thought_index(context)[problem] = thought
 
 
 @given("a search budget of {budget:d} tokens")
@@ -64,13 +164,7 @@ def step_search_budget(context, budget):
 def step_token_budget(context, budget):
     """Set token budget for search."""
     if not hasattr(context, 'search_config'):
-        context.search_config = {
-            "budget_tokens": None,
-            "beam_width": 3,
-            "max_depth": 10,
-            "timeout_seconds": None,
-            "goal_condition": None,
-        }
+        context.search_config = _DEFAULT_SEARCH_CONFIG.copy()
         context.tokens_used = 0
     context.search_config["budget_tokens"] = budget
 
@@ -97,23 +191,16 @@ def step_max_depth(context, depth):
 def step_goal_condition(context, condition):
     """Set goal condition for search termination."""
     context.search_config["goal_condition"] = condition
-    # Parse condition like "solution score above 0.9"
-    if "score above" in condition:
-        threshold = float(condition.split("above")[1].strip())
-        context.search_config["goal_threshold"] = threshold
+    match = _GOAL_THRESHOLD_RE.search(condition)
+    if match:
+        context.search_config["goal_threshold"] = float(match.group(1))
 
 
 @given("a time limit of {seconds:d} seconds")
 def step_time_limit(context, seconds):
     """Set timeout for search."""
     if not hasattr(context, 'search_config'):
-        context.search_config = {
-            "budget_tokens": None,
-            "beam_width": 3,
-            "max_depth": 10,
-            "timeout_seconds": None,
-            "goal_condition": None,
-        }
+        context.search_config = _DEFAULT_SEARCH_CONFIG.copy()
         context.tokens_used = 0
     context.search_config["timeout_seconds"] = seconds
 
@@ -126,7 +213,7 @@ def step_exploration_requires_tokens(context, tokens):
     if not hasattr(context, 'root_thought_id'):
         thought = context.graph.add_thought("Complex problem requiring exploration")
         context.root_thought_id = thought.id
-        context.thoughts_by_content = {"Complex problem requiring exploration": thought}
+        _thought_index(context)["Complex problem requiring exploration"] = thought
 
 
 @given("an exploration that would take {minutes:d} minutes")
@@ -137,7 +224,7 @@ def step_exploration_would_take_time(context, minutes):
     if not hasattr(context, 'root_thought_id'):
         thought = context.graph.add_thought("Problem requiring extended exploration")
         context.root_thought_id = thought.id
-        context.thoughts_by_content = {"Problem requiring extended exploration": thought}
+        _thought_index(context)["Problem requiring extended exploration"] = thought
 
 
 # =============================================================================
@@ -148,43 +235,33 @@ def step_exploration_would_take_time(context, minutes):
 def step_indefinite_problem(context):
     """Set up a problem with unlimited expansion potential."""
     context.current_problem = "Open-ended research question"
-    context.search_config = {
-        "budget_tokens": 10000,
-        "beam_width": 3,
-        "max_depth": 10,
-        "timeout_seconds": None,
-        "goal_condition": None,
-    }
+    context.search_config = dict(_DEFAULT_SEARCH_CONFIG, budget_tokens=10000)
     context.tokens_used = 0
 
     thought = context.graph.add_thought(context.current_problem)
     context.root_thought_id = thought.id
-    context.thoughts_by_content = {context.current_problem: thought}
+    _thought_index(context)[context.current_problem] = thought
 
 
 @given("an exploration where all branches have been pruned")
 def step_all_branches_pruned(context):
     """Set up an exploration with no viable paths."""
     context.current_problem = "Dead-end exploration"
-    context.search_config = {
-        "budget_tokens": 1000,
-        "beam_width": 3,
-        "max_depth": 10,
-        "timeout_seconds": None,
-        "goal_condition": None,
-    }
+    context.search_config = dict(_DEFAULT_SEARCH_CONFIG, budget_tokens=1000)
     context.tokens_used = 0
 
     # Create root and mark all children as pruned
     root = context.graph.add_thought(context.current_problem)
     context.root_thought_id = root.id
-    context.thoughts_by_content = {context.current_problem: root}
+    _thought_index(context)[context.current_problem] = root
 
     # Add children and mark them as pruned
+    index = _thought_index(context)
     for i in range(3):
-        child = context.graph.add_thought(f"Pruned path {i+1}", parent_id=root.id)
+        content = f"Pruned path {i+1}"
+        child = context.graph.add_thought(content, parent_id=root.id)
         context.graph.update_thought_status(child.id, "PRUNED")
-        context.thoughts_by_content[f"Pruned path {i+1}"] = child
+        index[content] = child
 
 
 # =============================================================================
@@ -195,32 +272,8 @@ def step_all_branches_pruned(context):
 def step_run_automated_exploration(context, persona):
     """Run automated exploration with configured settings."""
     context.current_persona = persona
-
-    cfg = context.search_config
-
-    # Build SearchConfig
-    search_config = SearchConfig(
-        beam_width=cfg["beam_width"],
-        max_depth=cfg["max_depth"],
-        max_expansions=cfg.get("max_expansions", 50),
-        timeout_seconds=cfg.get("timeout_seconds"),
-    )
-
-    # Run beam search with configuration
-    try:
-        result = asyncio.run(context.graph.beam_search(config=search_config))
-        context.search_result = result
-        context.search_error = None
-
-        # Simulate token usage based on expansions (lower estimate)
-        if hasattr(result, 'stats'):
-            context.tokens_used = result.stats.get('expansions_count', 0) * 20
-        else:
-            context.tokens_used = len(list(context.graph.thoughts.values())) * 20
-
-    except Exception as e:
-        context.search_error = e
-        context.search_result = None
+    # Simulate token usage based on expansions (lower estimate)
+    _run_search(context, tokens_per_expansion=20)
 
 
 @when("automated search runs")
@@ -231,47 +284,20 @@ def step_automated_search_runs(context):
     # Check for goal condition
     goal_predicate = None
     if cfg.get("goal_threshold"):
-        threshold = cfg["goal_threshold"]
-        goal_predicate = lambda t: t.score >= threshold if t.score else False
-
-    # Build SearchConfig
-    search_config = SearchConfig(
-        beam_width=cfg["beam_width"],
-        max_depth=cfg["max_depth"],
-        max_expansions=cfg.get("max_expansions", 50),
-        timeout_seconds=cfg.get("timeout_seconds"),
-    )
+        goal_predicate = _goal_at(cfg["goal_threshold"])
 
-    try:
-        result = asyncio.run(context.graph.beam_search(
-            config=search_config,
-            goal=goal_predicate,
-        ))
-        context.search_result = result
-        context.search_error = None
-
-        # Track token usage
-        if hasattr(result, 'stats'):
-            context.tokens_used = result.stats.get('expansions_count', 0) * 50
-        else:
-            context.tokens_used = len(list(context.graph.thoughts.values())) * 50
-
-    except Exception as e:
-        context.search_error = e
-        context.search_result = None
+    _run_search(context, tokens_per_expansion=50, goal=goal_predicate)
 
 
 @when("a thought scores {score:f}")
 def step_thought_scores(context, score):
     """Simulate a thought achieving a specific score during search."""
     # Add a high-scoring thought that meets the goal
-    thought = context.graph.add_thought(
-        f"Solution with score {score}",
-        parent_id=context.root_thought_id
-    )
+    content = f"Solution with score {score}"
+    thought = context.graph.add_thought(content, parent_id=context.root_thought_id)
     thought.score = score
     context.high_score_thought = thought
-    context.thoughts_by_content[f"Solution with score {score}"] = thought
+    _thought_index(context)[content] = thought
 
 
 # =============================================================================
@@ -284,15 +310,13 @@ def step_persona_on_thought(context, persona, content):
     context.current_persona = persona
 
     # Create the thought if it doesn't exist
-    if not hasattr(context, 'thoughts_by_content'):
-        context.thoughts_by_content = {}
-
-    if content not in context.thoughts_by_content:
-        thought = context.graph.add_thought(content)
-        context.thoughts_by_content[content] = thought
+    index = _thought_index(context)
+    thought = index.get(content)
+    if thought is None:
+        thought = index[content] = context.graph.add_thought(content)
         context.root_thought_id = thought.id
 
-    context.current_thought = context.thoughts_by_content[content]
+    context.current_thought = thought
 
 
 @given("a thought \"{content}\" marked as not viable")
@@ -300,7 +324,7 @@ def step_thought_marked_not_viable(context, content):
     """Create a pruned thought."""
     thought = context.graph.add_thought(content)
     context.graph.update_thought_status(thought.id, "PRUNED")
-    context.thoughts_by_content = {content: thought}
+    _thought_index(context)[content] = thought
     context.current_thought = thought
     context.pruned_thought = thought
 
@@ -313,11 +337,6 @@ def step_request_ai_expansion(context, persona):
     # Check if we're using mock LLM generator (for LLM integration tests)
     if hasattr(context, 'generator') and context.generator is not None:
         from features.steps.llm_steps import create_mock_context
-        from dataclasses import dataclass
-
-        @dataclass
-        class MockThought:
-            content: str
 
         mock_ctx = create_mock_context()
         # Convert string paths to MockThought objects
@@ -327,8 +346,8 @@ def step_request_ai_expansion(context, persona):
 
         thought_content = getattr(context, 'current_thought_content',
                                   getattr(context, 'current_problem', 'test'))
-        context.generated_thoughts = asyncio.run(
-            context.generator.generate(thought_content, mock_ctx)
+        context.generated_thoughts = run_async(
+            context, context.generator.generate(thought_content, mock_ctx)
         )
 
         # Track token usage
@@ -339,37 +358,14 @@ def step_request_ai_expansion(context, persona):
         return
 
     # Otherwise use the graph's expand method (async)
-    thought = context.current_thought
-    try:
-        result = asyncio.run(context.graph.expand(thought.id))
-        context.expansion_result = result
-        context.expansion_error = None
-
-        # Get the new children
-        children = context.graph.get_children(thought.id)
-        context.generated_thoughts = children
-
-    except Exception as e:
-        context.expansion_error = e
-        context.expansion_result = None
-        context.generated_thoughts = []
+    _expand_current(context)
 
 
 @when("{persona} tries to expand this thought")
 def step_try_expand_pruned(context, persona):
     """Attempt to expand a thought (may be pruned)."""
     context.current_persona = persona
-    thought = context.current_thought
-
-    try:
-        result = asyncio.run(context.graph.expand(thought.id))
-        context.expansion_result = result
-        context.expansion_error = None
-        context.generated_thoughts = context.graph.get_children(thought.id)
-    except Exception as e:
-        context.expansion_error = e
-        context.expansion_result = None
-        context.generated_thoughts = []
+    _expand_current(context)
 
 
 # =============================================================================
@@ -388,10 +384,9 @@ def step_top_paths_found(context, count):
 @then("each path should be scored by feasibility")
 def step_paths_scored(context):
     """Verify paths have feasibility scores."""
-    # Thoughts in the graph should have scores
-    thoughts = list(context.graph.thoughts.values())
-    scored_thoughts = [t for t in thoughts if t.score is not None]
-    assert len(scored_thoughts) > 0, "Some thoughts should be scored"
+    # Thoughts in the graph should have scores; stop at the first one found
+    assert any(t.score is not None for t in context.graph.thoughts.values()), \
+        "Some thoughts should be scored"
 
 
 @then("the total token usage should not exceed {budget:d}")
@@ -430,10 +425,9 @@ def step_budget_preserved(context):
 @then("no thought should be created beyond depth {max_depth:d}")
 def step_no_thought_beyond_depth(context, max_depth):
     """Verify depth limit was respected."""
-    thoughts = list(context.graph.thoughts.values())
-    for thought in thoughts:
-        assert thought.depth <= max_depth, \
-            f"Thought at depth {thought.depth} exceeds limit {max_depth}"
+    deepest = max((t.depth for t in context.graph.thoughts.values()), default=0)
+    assert deepest <= max_depth, \
+        f"Thought at depth {deepest} exceeds limit {max_depth}"
 
 
 @then("the best solutions within {depth:d} levels should be returned")
@@ -446,12 +440,11 @@ def step_best_within_depth(context, depth):
 def step_note_indicates(context, message):
     """Verify a note or message is present."""
     # Check termination reason for depth-related message
-    if hasattr(context.search_result, 'termination_reason'):
-        reason = context.search_result.termination_reason
+    reason = getattr(context.search_result, 'termination_reason', _MISSING)
+    if reason is not _MISSING:
         if "depth" in message.lower():
             # Accept completed if max_depth was configured (search respected it)
-            valid_reasons = ['max_depth', 'depth_limit', 'completed']
-            assert reason in valid_reasons, \
+            assert reason in _DEPTH_REASONS, \
                 f"Expected depth-related reason, got {reason}"
 
 
@@ -465,8 +458,7 @@ def step_stop_at_budget(context):
 @then("partial results should be returned")
 def step_partial_results(context):
     """Verify partial results are available."""
-    thoughts = list(context.graph.thoughts.values())
-    assert len(thoughts) > 0, "Should have some thoughts from partial exploration"
+    assert len(context.graph) > 0, "Should have some thoughts from partial exploration"
 
 
 @then("{persona} should see \"{message}\"")
@@ -499,21 +491,17 @@ def step_recommendations_provided(context):
 @then("search should terminate with \"{reason}\"")
 def step_terminate_with_reason(context, reason):
     """Verify search terminated with specific reason."""
-    if hasattr(context.search_result, 'termination_reason'):
-        actual = context.search_result.termination_reason
+    actual = getattr(context.search_result, 'termination_reason', _MISSING)
+    if actual is not _MISSING:
         # Map business language to technical reasons
-        reason_map = {
-            "No viable paths remaining": ["completed", "no_viable_paths"],
-        }
-        expected = reason_map.get(reason, [reason.lower().replace(" ", "_")])
-        assert actual in expected, f"Expected {expected}, got {actual}"
+        expected = _REASON_MAP.get(reason) or {reason.lower().replace(" ", "_")}
+        assert actual in expected, f"Expected {sorted(expected)}, got {actual}"
 
 
 @then("explored thoughts should still be available")
 def step_thoughts_available(context):
     """Verify explored thoughts remain accessible."""
-    thoughts = list(context.graph.thoughts.values())
-    assert len(thoughts) > 0, "Thoughts should be available"
+    assert len(context.graph) > 0, "Thoughts should be available"
 
 
 @then("suggestions for alternative starting points should be offered")
@@ -529,17 +517,17 @@ def step_stop_at_timeout(context, seconds):
     # Search either timed out or completed before timeout
     assert context.search_result is not None, "Search should complete"
     # If it has a termination reason, accept either timeout or completed
-    if hasattr(context.search_result, 'termination_reason'):
-        valid = ['timeout', 'completed', 'max_depth', 'max_expansions']
-        reason = context.search_result.termination_reason
-        assert reason in valid, f"Expected one of {valid}, got {reason}"
+    reason = getattr(context.search_result, 'termination_reason', _MISSING)
+    if reason is not _MISSING:
+        assert reason in _TIMEOUT_REASONS, \
+            f"Expected one of {sorted(_TIMEOUT_REASONS)}, got {reason}"
     # Otherwise just accept that search completed
 
 
 @then("the best results found so far should be returned")
 def step_best_results_returned(context):
     """Verify best results are available."""
-    assert context.search_result is not None or len(list(context.graph.thoughts.values())) > 0
+    assert context.search_result is not None or len(context.graph) > 0
 
 
 @then("{persona} should see estimated time to complete remaining exploration")
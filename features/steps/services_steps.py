@@ -1,6 +1,8 @@
 """
 Step definitions for service implementations BDD tests.
 """
+from functools import lru_cache
+
 from behave import given, when, then, use_step_matcher
 
 from graph_of_thought.services.implementations import (
@@ -26,6 +28,18 @@ from graph_of_thought.domain import (
 use_step_matcher("parse")
 
 
+@lru_cache(maxsize=16)
+def _priority(name: str) -> Priority:
+    """Priority member named in a feature file."""
+    return Priority[name]
+
+
+@lru_cache(maxsize=16)
+def _approval_status(name: str) -> ApprovalStatus:
+    """ApprovalStatus member named in a feature file."""
+    return ApprovalStatus[name]
+
+
 # =============================================================================
 # InMemory Services (for testing with configurable behavior)
 # =============================================================================
@@ -57,7 +71,7 @@ def step_check_approval(context, action):
 
 @then('the approval status should be "{status}"')
 def step_check_approval_status(context, status):
-    expected = ApprovalStatus[status]
+    expected = _approval_status(status)
     assert context.approval_status == expected, \
         f"Expected {status}, got {context.approval_status}"
 
@@ -319,7 +333,7 @@ def step_simple_question(context):
 @when('I ask a question "{question}" with priority "{priority}"')
 def step_ask_question_with_priority(context, question, priority):
     context.ticket = context.question_service.ask(
-        question, priority=Priority[priority]
+        question, priority=_priority(priority)
     )
 
 
@@ -341,7 +355,7 @@ def step_check_ticket_status(context, status):
 
 @then('the ticket should have priority "{priority}"')
 def step_check_ticket_priority(context, priority):
-    assert context.ticket.priority == Priority[priority]
+    assert context.ticket.priority == _priority(priority)
 
 
 @then('the question should be routed to "{target}"')
@@ -388,7 +402,7 @@ def step_pending_question(context, question):
 
 @given('a question "{question}" with priority "{priority}"')
 def step_question_with_priority(context, question, priority):
-    context.question_service.ask(question, priority=Priority[priority])
+    context.question_service.ask(question, priority=_priority(priority))
 
 
 @when('I provide answer "{answer}" from "{answerer}"')
@@ -410,7 +424,7 @@ def step_get_pending(context):
 
 @then('the first question should have priority "{priority}"')
 def step_check_first_priority(context, priority):
-    assert context.pending_questions[0].priority == Priority[priority]
+    assert context.pending_questions[0].priority == _priority(priority)
 
 
 # =============================================================================
@@ -5,6 +5,8 @@ from behave import given, when, then, use_step_matcher
 
 from graph_of_thought.core.defaults import InMemoryTracingProvider, InMemoryTraceSpan
 
+from features.steps.helpers import parse_key_values
+
 use_step_matcher("parse")
 
 
@@ -27,7 +29,7 @@ use_step_matcher("re")
 
 @when(r'I start a span "(?P<name>[^"]+)" with attributes (?P<attrs>.+)')
 def step_start_span_with_attrs(context, name, attrs):
-    parsed_attrs = _parse_attributes(attrs)
+    parsed_attrs = parse_key_values(attrs)
     span = context.tracing.start_span(name, attributes=parsed_attrs)
     context.spans[name] = span
     context.current_span = span
@@ -94,7 +96,7 @@ use_step_matcher("re")
 def step_add_event_with_attrs(context, event_name, attrs, span_name):
     span = context.spans.get(span_name)
     if span:
-        parsed_attrs = _parse_attributes(attrs)
+        parsed_attrs = parse_key_values(attrs)
         span.add_event(event_name, attributes=parsed_attrs)
 
 
@@ -199,8 +201,10 @@ def step_span_has_duration(context, name):
 def step_span_has_attribute(context, name, key, value):
     span = context.spans.get(name)
     assert span is not None, f"Span '{name}' not found"
-    assert key in span.attributes, f"Span '{name}' missing attribute '{key}'"
-    assert str(span.attributes[key]) == value, f"Expected {key}='{value}', got '{span.attributes[key]}'"
+    attributes = span.attributes  # property returns a copy; read it once
+    assert key in attributes, f"Span '{name}' missing attribute '{key}'"
+    actual = attributes[key]
+    assert actual == value or str(actual) == value, f"Expected {key}='{value}', got '{actual}'"
 
 
 @then('the span "{name}" should have {count:d} attributes')
@@ -224,8 +228,8 @@ def step_span_event_count(context, name, count):
 def step_span_has_event(context, name, event_name):
     span = context.spans.get(name)
     assert span is not None, f"Span '{name}' not found"
-    event_names = [e["name"] for e in span.events]
-    assert event_name in event_names, f"Span '{name}' missing event '{event_name}'"
+    assert any(e["name"] == event_name for e in span.events), \
+        f"Span '{name}' missing event '{event_name}'"
 
 
 @then('the span "{name}" should have status "{status}"')
@@ -316,37 +320,3 @@ def step_dict_has_attributes(context):
 @then("the dictionary should contain the events")
 def step_dict_has_events(context):
     assert "events" in context.span_dict, "Dictionary missing 'events'"
-
-
-# =============================================================================
-# Helper Functions
-# =============================================================================
-
-def _parse_attributes(attrs_str: str) -> dict:
-    """Parse attribute string like 'service=\"api\", version=\"1.0\"' into dict."""
-    result = {}
-    parts = []
-    current = ""
-    in_quotes = False
-
-    for char in attrs_str:
-        if char == '"':
-            in_quotes = not in_quotes
-            current += char
-        elif char == ',' and not in_quotes:
-            parts.append(current.strip())
-            current = ""
-        else:
-            current += char
-
-    if current.strip():
-        parts.append(current.strip())
-
-    for part in parts:
-        if '=' in part:
-            key, value = part.split('=', 1)
-            key = key.strip()
-            value = value.strip().strip('"')
-            result[key] = value
-
-    return result
@@ -576,6 +576,10 @@ class InMemoryTracingProvider:
 
     def __init__(self):
         self._spans: list[InMemoryTraceSpan] = []
+        # Spans grouped by name and root spans, in start order; names and
+        # parents are fixed at creation so these never need rebuilding
+        self._spans_by_name: dict[str, list[InMemoryTraceSpan]] = {}
+        self._root_spans: list[InMemoryTraceSpan] = []
         self._active_span: InMemoryTraceSpan | None = None
 
     def start_span(
@@ -602,6 +606,9 @@ class InMemoryTracingProvider:
         parent = parent_span if parent_span is not None else self._active_span
         span = InMemoryTraceSpan(name, parent=parent, attributes=attributes, provider=self)
         self._spans.append(span)
+        self._spans_by_name.setdefault(name, []).append(span)
+        if parent is None:
+            self._root_spans.append(span)
         self._active_span = span
         return span
 
@@ -612,22 +619,22 @@ class InMemoryTracingProvider:
 
     def get_span(self, name: str) -> InMemoryTraceSpan | None:
         """Get a span by name (returns first match)."""
-        for span in self._spans:
-            if span.name == name:
-                return span
-        return None
+        spans = self._spans_by_name.get(name)
+        return spans[0] if spans else None
 
     def get_spans_by_name(self, name: str) -> list[InMemoryTraceSpan]:
         """Get all spans with a given name."""
-        return [span for span in self._spans if span.name == name]
+        return list(self._spans_by_name.get(name, ()))
 
     def get_root_spans(self) -> list[InMemoryTraceSpan]:
         """Get all root spans (spans without parents)."""
-        return [span for span in self._spans if span.parent is None]
+        return list(self._root_spans)
 
     def reset(self) -> None:
         """Clear all stored spans."""
         self._spans.clear()
+        self._spans_by_name.clear()
+        self._root_spans.clear()
         self._active_span = None
 
 
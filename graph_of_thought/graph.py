@@ -5,9 +5,11 @@ Main Graph of Thought implementation.
 from __future__ import annotations
 from typing import TypeVar, Generic, Any, Callable, Iterator
 from collections import deque
+import asyncio
 import heapq
 import json
 import time
+import uuid
 
 from .core import (
     Thought,
@@ -278,7 +280,6 @@ class GraphOfThought(Generic[T]):
         else:
             parent_depth = -1
         
-        import uuid
         thought = Thought(
             content=content,
             score=score if score is not None else 0.0,
@@ -306,7 +307,6 @@ class GraphOfThought(Generic[T]):
         self._metrics.gauge("thoughts.total", len(self._thoughts))
         
         # Emit event
-        import asyncio
         try:
             loop = asyncio.get_running_loop()
             loop.create_task(self._event_emitter.emit(
@@ -868,7 +868,6 @@ class GraphOfThought(Generic[T]):
         
         max_depth = max(self._thoughts[tid].depth for tid in thought_ids)
         
-        import uuid
         merged = Thought(
             content=merged_content,
             score=score or 0.0,
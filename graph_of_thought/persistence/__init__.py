@@ -12,8 +12,9 @@ Example implementations that could be added:
 """
 
 from __future__ import annotations
-from typing import TypeVar, Any
+from typing import TypeVar, Any, cast
 import json
+import math
 import os
 from pathlib import Path
 
@@ -27,6 +28,85 @@ from ..core import (
 
 T = TypeVar("T")
 
+# orjson is an optional speedup for the file backend (the ``fast`` extra).
+# Stored files must not depend on whether it is installed, so values are
+# first reduced to what json.dumps(default=str) would write, and anything
+# orjson would render differently is encoded by the stdlib instead.
+_orjson: Any
+try:
+    import orjson as _orjson
+except ImportError:  # pragma: no cover - depends on environment
+    _orjson = None
+
+_JSON_ENCODER = json.JSONEncoder(indent=2, default=str)
+_JSON_DECODER = json.JSONDecoder()
+
+
+class _OrjsonMismatchError(Exception):
+    """Raised when orjson cannot reproduce the stdlib encoding of a value."""
+
+
+def _plain_key(key: Any) -> str:
+    """Convert a dict key the way the stdlib encoder does."""
+    if isinstance(key, str):
+        return str.__str__(key)
+    if isinstance(key, float) and math.isfinite(key):
+        return float.__repr__(key)
+    if key is True:
+        return "true"
+    if key is False:
+        return "false"
+    if key is None:
+        return "null"
+    if isinstance(key, int):
+        return int.__repr__(key)
+    raise _OrjsonMismatchError
+
+
+def _plain(value: Any) -> Any:
+    """Reduce ``value`` to the JSON types json.dumps(default=str) would write."""
+    if isinstance(value, str):
+        return str.__str__(value)
+    if value is None or value is True or value is False:
+        return value
+    if isinstance(value, int):
+        return int(value)
+    if isinstance(value, float):
+        # repr() switches to exponent form outside this range, which orjson
+        # spells differently ("1e-07" vs "1e-7"); NaN and infinities fail too
+        if value != 0.0 and not 1e-4 <= abs(value) < 1e16:
+            raise _OrjsonMismatchError
+        return float(value)
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    if isinstance(value, dict):
+        plain = {_plain_key(k): _plain(v) for k, v in value.items()}
+        if len(plain) != len(value):
+            raise _OrjsonMismatchError  # distinct keys collided, e.g. 1 and "1"
+        return plain
+    return str(value)
+
+
+def _dumps(data: dict[str, Any]) -> bytes:
+    """Serialize persisted data to UTF-8 JSON bytes."""
+    if _orjson is not None:
+        try:
+            content: bytes = _orjson.dumps(_plain(data), option=_orjson.OPT_INDENT_2)
+        except (_OrjsonMismatchError, _orjson.JSONEncodeError, RecursionError):
+            pass
+        else:
+            # orjson writes non-ASCII and DEL unescaped; the stdlib escapes them
+            if content.isascii() and b"\x7f" not in content:
+                return content
+    return _JSON_ENCODER.encode(data).encode('utf-8')
+
+
+def _loads(content: bytes) -> dict[str, Any]:
+    """Deserialize UTF-8 JSON bytes written by _dumps."""
+    # Always the stdlib decoder: orjson rejects the NaN/Infinity tokens the
+    # stdlib encoder writes and turns integers beyond 64 bits into floats.
+    return cast("dict[str, Any]", _JSON_DECODER.decode(content.decode('utf-8')))
+
 
 class InMemoryPersistence:
     """
@@ -133,10 +213,24 @@ class FilePersistence:
         self.base_dir = str(base_dir)
         self._fs = filesystem or RealFileSystem()
         self._fs.mkdir(self.base_dir, parents=True)
+        # Graph ids written or deleted through this instance
+        self._written_ids: set[str] = set()
 
     def _graph_path(self, graph_id: str) -> str:
         return f"{self.base_dir}/{graph_id}.json"
 
+    def has_graph_file(self, graph_id: str) -> bool:
+        """
+        Check whether a graph file exists, without touching the filesystem
+        when the graph was saved through this instance.
+
+        Files removed outside this backend are not noticed for ids it wrote;
+        check the filesystem directly when that matters.
+        """
+        if graph_id in self._written_ids:
+            return True
+        return self._fs.exists(self._graph_path(graph_id))
+
     def _checkpoint_dir(self, graph_id: str) -> str:
         return f"{self.base_dir}/checkpoints/{graph_id}"
 
@@ -160,10 +254,11 @@ class FilePersistence:
 
         path = self._graph_path(graph_id)
         try:
-            content = json.dumps(data, indent=2, default=str).encode('utf-8')
+            content = _dumps(data)
             self._fs.write(path, content)
         except Exception as e:
             raise PersistenceError("save_graph", e)
+        self._written_ids.add(graph_id)
 
     async def load_graph(
         self,
@@ -175,7 +270,7 @@ class FilePersistence:
 
         try:
             content = self._fs.read(path)
-            data = json.loads(content.decode('utf-8'))
+            data = _loads(content)
 
             thoughts = {tid: Thought.from_dict(td) for tid, td in data["thoughts"].items()}
             edges = [Edge.from_dict(ed) for ed in data["edges"]]
@@ -206,7 +301,7 @@ class FilePersistence:
 
         path = self._checkpoint_path(graph_id, checkpoint_id)
         try:
-            content = json.dumps(data, indent=2, default=str).encode('utf-8')
+            content = _dumps(data)
             self._fs.write(path, content)
         except Exception as e:
             raise PersistenceError("save_checkpoint", e)
@@ -222,7 +317,7 @@ class FilePersistence:
 
         try:
             content = self._fs.read(path)
-            data = json.loads(content.decode('utf-8'))
+            data = _loads(content)
 
             thoughts = {tid: Thought.from_dict(td) for tid, td in data["thoughts"].items()}
             edges = [Edge.from_dict(ed) for ed in data["edges"]]
@@ -234,6 +329,7 @@ class FilePersistence:
 
     async def delete_graph(self, graph_id: str) -> bool:
         path = self._graph_path(graph_id)
+        self._written_ids.discard(graph_id)
         if self._fs.exists(path):
             self._fs.delete(path)
             # Also delete checkpoints
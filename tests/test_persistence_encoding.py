@@ -0,0 +1,124 @@
+"""
+Unit tests for the JSON encoding used by FilePersistence.
+
+orjson is an optional speedup; the bytes written to disk must be identical
+whether or not it is installed. Each test encodes the same data through the
+orjson path and the stdlib path and compares the results.
+"""
+
+import math
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime
+from enum import Enum, IntEnum
+
+import pytest
+
+from graph_of_thought import persistence
+from graph_of_thought.domain.models import Edge, Thought
+
+orjson = pytest.importorskip("orjson")
+
+
+class Color(Enum):
+    RED = "red"
+
+
+class Level(str, Enum):
+    HIGH = "high"
+
+
+class Rank(IntEnum):
+    FIRST = 1
+
+
+@dataclass
+class Point:
+    x: int
+    y: int
+
+
+def _stdlib_dumps(data, monkeypatch):
+    with monkeypatch.context() as m:
+        m.setattr(persistence, "_orjson", None)
+        return persistence._dumps(data)
+
+
+@pytest.mark.parametrize("value", [
+    datetime(2024, 1, 1),
+    date(2024, 1, 1),
+    Color.RED,
+    Level.HIGH,
+    Rank.FIRST,
+    Point(1, 2),
+    uuid.UUID(int=1),
+    {1, 2},
+    (1, "two", 3.0),
+    float("nan"),
+    float("inf"),
+    1e-07,
+    1e16,
+    0.0001,
+    -0.0,
+    2 ** 70,
+    "café",
+    "tab\tbell\x07del\x7f",
+    {},
+    [],
+    {"nested": {"empty": [], "deep": [{}]}},
+])
+def test_value_encodes_identically(value, monkeypatch):
+    data = {"value": value}
+    assert persistence._dumps(data) == _stdlib_dumps(data, monkeypatch)
+
+
+@pytest.mark.parametrize("key", [1, 1.5, 1e-07, True, False, None, Level.HIGH])
+def test_non_str_key_encodes_identically(key, monkeypatch):
+    data = {"metadata": {key: "v"}}
+    assert persistence._dumps(data) == _stdlib_dumps(data, monkeypatch)
+
+
+def test_colliding_keys_encode_identically(monkeypatch):
+    data = {"metadata": {1: "int", "1": "str"}}
+    assert persistence._dumps(data) == _stdlib_dumps(data, monkeypatch)
+
+
+def test_random_floats_encode_identically(monkeypatch):
+    rng = random.Random(0)
+    floats = [rng.uniform(-1e6, 1e6) for _ in range(500)]
+    floats += [10 ** rng.uniform(-6, 18) for _ in range(500)]
+    data = {"scores": floats}
+    assert persistence._dumps(data) == _stdlib_dumps(data, monkeypatch)
+
+
+def test_graph_data_encodes_identically(monkeypatch):
+    root = Thought(content="Root idea", score=0.75, depth=0)
+    child = Thought(content="Follow-up → detail", score=0.5, depth=1)
+    data = {
+        "graph_id": "g1",
+        "thoughts": {t.id: t.to_dict() for t in (root, child)},
+        "edges": [Edge(source_id=root.id, target_id=child.id).to_dict()],
+        "root_ids": [root.id],
+        "metadata": {"created": datetime(2024, 1, 1), "color": Color.RED},
+    }
+    assert persistence._dumps(data) == _stdlib_dumps(data, monkeypatch)
+
+
+def test_loads_reads_stdlib_only_tokens(monkeypatch):
+    data = {"score": float("nan"), "big": 2 ** 70}
+    loaded = persistence._loads(_stdlib_dumps(data, monkeypatch))
+    assert math.isnan(loaded["score"])
+    assert loaded["big"] == 2 ** 70
+
+
+def test_plain_data_takes_orjson_path(monkeypatch):
+    class NoStdlib:
+        def encode(self, data):
+            raise AssertionError("stdlib encoder used for plain data")
+
+    root = Thought(content="Root idea", score=0.75)
+    data = {"thoughts": {root.id: root.to_dict()}, "metadata": {"created": datetime(2024, 1, 1)}}
+    expected = _stdlib_dumps(data, monkeypatch)
+    monkeypatch.setattr(persistence, "_JSON_ENCODER", NoStdlib())
+    assert persistence._dumps(data) == expected